@@ -1,8 +1,16 @@
-from .bfs import bfs
-from .dfs import dfs
-from .dijkstra import dijkstra
+from .all_pairs_dijkstra import all_pairs_dijkstra
+from .astar import astar
+from .bfs import bfs, bfs_levels, iter_bfs
+from .bidirectional_dijkstra import bidirectional_dijkstra
+from .boruvka import boruvka
+from .components import connected_components, strongly_connected_components
+from .contraction_hierarchy import ContractionHierarchy, build_contraction_hierarchy
+from .dfs import dfs, iter_dfs
+from .dijkstra import dijkstra, dijkstra_many, distance_matrix
+from .dynamic_dijkstra import DynamicShortestPaths
 from .hierholzer import hierholzer
-from .kruskal import kruskal
-from .prim import prim
+from .kruskal import kruskal, kruskal_stream
+from .path_cache import ShortestPathCache
+from .prim import minimum_spanning_forest, prim
 
-__all__ = ["bfs", "dfs", "dijkstra", "hierholzer", "kruskal", "prim"]
+__all__ = ["all_pairs_dijkstra", "astar", "bfs", "bfs_levels", "bidirectional_dijkstra", "boruvka", "build_contraction_hierarchy", "connected_components", "ContractionHierarchy", "dfs", "dijkstra", "dijkstra_many", "distance_matrix", "DynamicShortestPaths", "hierholzer", "iter_bfs", "iter_dfs", "kruskal", "kruskal_stream", "minimum_spanning_forest", "prim", "ShortestPathCache", "strongly_connected_components"]
@@ -0,0 +1,126 @@
+"""
+Parallel All-Pairs Dijkstra
+
+This computes the shortest path distances from many sources by splitting the sources across a
+pool of worker processes, each running the batched Dijkstra search of distance_matrix(). The graph
+is not pickled for every task: its arrays are written once in the binary format of Graph.save()
+(or the file it was loaded from is reused) and every worker memory-maps it, so all the processes
+share one copy of the arrays through the page cache. The workers only see dense node indices, so
+any hashable node ids work, and the rows are mapped back to the node ids in the calling process.
+
+Parameters:
+- graph: A weighted Graph object, or a CSRGraph from Graph.freeze() or graph.load().
+- sources: Optional nodes to compute the distances from. All nodes by default.
+- targets: Optional nodes to compute the distances to. All nodes by default.
+- workers: Number of worker processes, os.cpu_count() by default. With workers=1 the searches
+  run in the calling process.
+- chunk_size: Number of sources sent to a worker per task. By default the sources are split in
+  about four tasks per worker.
+- matrix: If True, return a NumPy array instead of an iterator.
+
+Returns:
+- An iterator of (source, row) pairs in the order of sources, where row is an array of the
+  distances to each target as floats (inf when unreachable). Rows are yielded as the workers
+  finish them, with a bounded number of tasks in flight.
+- With matrix=True, a (len(sources), len(targets)) float64 NumPy array.
+"""
+
+import os
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+from graph import CSRGraph, Node, load
+from utils.errors import NodeNotFoundError
+from .dijkstra import _batched_search_csr
+
+_worker_state = None # (graph, targets) of the current worker process
+
+def all_pairs_dijkstra(graph, sources=None, targets=None, workers=None, chunk_size=None, matrix=False):
+    sources = list(graph.nodes) if sources is None else list(sources)
+    targets = None if targets is None else list(targets) # Read once, it can be a generator
+    rows = _rows(graph, sources, targets, workers, chunk_size)
+    if not matrix:
+        return rows
+    num_targets = len(graph.nodes) if targets is None else len(targets)
+    result = np.empty((len(sources), num_targets))
+    for i, (_, row) in enumerate(rows):
+        result[i] = np.frombuffer(row, dtype=np.float64)
+    return result
+
+def _rows(graph, sources, targets, workers, chunk_size):
+    for node in sources if targets is None else sources + targets:
+        if node not in graph.nodes:
+            raise NodeNotFoundError(node)
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    targets = list(graph.node_ids) if targets is None else targets
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _serial_rows(graph, sources, targets)
+    if chunk_size is None:
+        chunk_size = max(1, len(sources) // (4 * workers))
+    return _parallel_rows(graph, sources, targets, workers, chunk_size)
+
+def _serial_rows(graph, sources, targets):
+    for start in range(0, len(sources), 1024):
+        chunk = sources[start:start + 1024]
+        yield from zip(chunk, _split(_distance_rows(graph, chunk, targets), len(chunk), len(targets)))
+
+def _parallel_rows(graph, sources, targets, workers, chunk_size):
+    # Share the graph through a memory-mapped file, reusing the one it was loaded from. A temporary
+    # file only holds the arrays with integer ids, since the workers only need the indices:
+    path = graph.path
+    temporary = None
+    if path is None:
+        descriptor, temporary = tempfile.mkstemp(suffix=".graph")
+        os.close(descriptor)
+        node_ids = list(range(len(graph.node_ids)))
+        arrays = CSRGraph(graph.directed, graph.weighted, {i: Node(i) for i in node_ids}, node_ids,
+                          graph.indptr, graph.indices, graph.weights)
+        arrays.save(temporary)
+        path = temporary
+    index = graph.index
+    target_indices = [index[node] for node in targets]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, target_indices)) as executor:
+            chunks = iter([sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)])
+            pending = deque()
+            def _submit(chunk):
+                pending.append((chunk, executor.submit(_worker_rows, [index[node] for node in chunk])))
+            # Keep a couple of tasks per worker in flight, so finished rows don't pile up:
+            for chunk in islice(chunks, 2 * workers):
+                _submit(chunk)
+            while pending:
+                done, future = pending.popleft()
+                rows = future.result()
+                for chunk in islice(chunks, 1):
+                    _submit(chunk)
+                yield from zip(done, _split(rows, len(done), len(targets)))
+    finally:
+        if temporary is not None:
+            os.remove(temporary)
+
+def _init_worker(path, target_indices):
+    global _worker_state
+    graph = load(path, mmap=True)
+    _worker_state = (graph, [graph.node_ids[i] for i in target_indices])
+
+def _worker_rows(source_indices):
+    graph, targets = _worker_state
+    return _distance_rows(graph, [graph.node_ids[i] for i in source_indices], targets)
+
+def _distance_rows(graph, sources, targets):
+    # Distances from each source to the (already validated) targets, as one flat array of float64 rows:
+    rows = {}
+    for start_node, distance_of, _ in _batched_search_csr(graph, {source: targets for source in sources}):
+        rows[start_node] = array("d", [distance_of(node) for node in targets])
+    flat = array("d")
+    for source in sources:
+        flat.extend(rows[source])
+    return flat
+
+def _split(flat, count, length):
+    return [flat[i * length:(i + 1) * length] for i in range(count)]
@@ -0,0 +1,88 @@
+"""
+A* Search Algorithm
+
+This algorithm finds the shortest path between two nodes of a weighted graph with non-negative weights.
+It works like Dijkstra's algorithm, but orders the nodes by distance from start plus an estimate of the
+remaining distance to goal, so the search is pulled towards goal and settles far fewer nodes.
+
+Parameters:
+- graph: A weighted Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight),
+  or a CSRGraph from Graph.freeze().
+- start: The node from which to start the search.
+- goal: The node to reach.
+- heuristic: A function heuristic(node, goal) estimating the remaining distance, or "euclidean" / "haversine"
+  to use the built-in heuristics on pos. The estimate must never exceed the real distance for the result
+  to be a shortest path. Without heuristic or pos the search behaves like Dijkstra's algorithm.
+- pos: Dictionary of node -> (x, y) coordinates, the same one passed to draw_graph. For "haversine",
+  the coordinates are (longitude, latitude) in degrees and the estimate is in meters.
+- scale: Factor converting the coordinate distance into weight units.
+
+Returns:
+- [distance, path_edges], or None if goal can't be reached.
+"""
+
+import heapq
+import math
+from itertools import count
+from utils.errors import NodeNotFoundError
+
+EARTH_RADIUS = 6371008.8 # Mean Earth radius, in meters
+
+def euclidean_heuristic(pos, scale=1):
+    # Straight-line distance between the coordinates of two nodes:
+    def _heuristic(node, goal):
+        x1, y1 = pos[node]
+        x2, y2 = pos[goal]
+        return scale * math.hypot(x2 - x1, y2 - y1)
+    return _heuristic
+
+def haversine_heuristic(pos, scale=1):
+    # Great-circle distance in meters between two (longitude, latitude) coordinates:
+    def _heuristic(node, goal):
+        lon1, lat1 = map(math.radians, pos[node])
+        lon2, lat2 = map(math.radians, pos[goal])
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return scale * 2 * EARTH_RADIUS * math.asin(min(1, math.sqrt(a)))
+    return _heuristic
+
+HEURISTICS = {
+    "euclidean": euclidean_heuristic,
+    "haversine": haversine_heuristic
+}
+
+def astar(graph, start, goal, heuristic=None, pos=None, scale=1):
+    for node in (start, goal):
+        if node not in graph.nodes:
+            raise NodeNotFoundError(node)
+    if heuristic is None and pos is not None:
+        heuristic = "euclidean"
+    if isinstance(heuristic, str):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic '{heuristic}', expected one of {list(HEURISTICS)}.")
+        if pos is None:
+            raise ValueError(f"The '{heuristic}' heuristic needs the pos coordinates.")
+        heuristic = HEURISTICS[heuristic](pos, scale)
+    if heuristic is None:
+        heuristic = lambda node, goal: 0
+    distances = {start: 0}
+    predecessors = {start: None}
+    tie_breaker = count() # Avoid comparing node ids when priorities are equal
+    priority_queue = [(heuristic(start, goal), next(tie_breaker), 0, start)] # (estimate, tie, distance, node)
+    while priority_queue:
+        _, _, current_distance, current_node = heapq.heappop(priority_queue)
+        if current_distance > distances[current_node]:
+            continue
+        if current_node == goal:
+            path = []
+            while current_node is not None:
+                path.append(current_node)
+                current_node = predecessors[current_node]
+            path.reverse()
+            return [current_distance, [(path[i], path[i+1]) for i in range(len(path)-1)]]
+        for neighbor, weight in graph.get_neighbors(current_node):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance + heuristic(neighbor, goal), next(tie_breaker), distance, neighbor))
+    return None # No path exists to goal:
@@ -6,25 +6,91 @@ It visits all nodes at the present 'depth' level before moving on to nodes
 at the next depth level.
 
 Parameters:
-- graph: Graph object that provides a get_neighbors method.
+- graph: Graph object that provides a get_neighbors method, or a CSRGraph from Graph.freeze().
 - start_node: The node from which to start the traversal.
 
 Returns:
-- List of nodes in the order they were visited.
+- List of nodes in the order they were visited. iter_bfs(graph, start) yields the
+  same nodes lazily, so the traversal can be stopped early.
+
+Level-synchronous mode:
+- bfs_levels(graph, sources, max_depth=None) expands whole frontiers at once with NumPy over
+  the CSR arrays, starting from one or many sources. It returns an array with the number of
+  hops from the nearest source to each node (-1 when unreachable), aligned with graph.node_ids
+  for a CSRGraph or with list(graph.nodes) for a Graph.
 """
 
+from collections import deque
+import numpy as np
+from graph import CSRGraph
+from utils.errors import NodeNotFoundError
+
 def bfs(graph, start):
+    return list(iter_bfs(graph, start))
+
+def iter_bfs(graph, start):
     if start not in graph.nodes:
-        return []
-    visited = set()
-    queue = [start]
-    path = []
+        return
+    if isinstance(graph, CSRGraph):
+        yield from _iter_bfs_csr(graph, start)
+        return
+    # Nodes are marked when queued, so each one enters the queue only once:
+    visited = {start}
+    queue = deque([start])
     while queue:
-        node = queue.pop(0)
-        if node not in visited:
-            visited.add(node)
-            path.append(node)
-            for neighbor, _ in graph.get_neighbors(node):
-                if neighbor not in visited:
-                    queue.append(neighbor)
-    return path
+        node = queue.popleft()
+        yield node
+        for neighbor, _ in graph.get_neighbors(node):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+
+def _iter_bfs_csr(graph, start):
+    # Same traversal over the dense integer ids of a frozen graph:
+    indptr, indices, node_ids = graph.indptr, graph.indices, graph.node_ids
+    visited = bytearray(len(node_ids))
+    source = graph.index[start]
+    visited[source] = 1
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        yield node_ids[node]
+        for p in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[p]
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                queue.append(neighbor)
+
+def bfs_levels(graph, sources, max_depth=None):
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    try:
+        single_source = sources in graph.index
+    except TypeError: # Unhashable, so it is a collection of sources
+        single_source = False
+    if single_source:
+        sources = [sources]
+    for node in sources:
+        if node not in graph.index:
+            raise NodeNotFoundError(node)
+    # Views over the CSR buffers, no copy is made:
+    indptr = np.frombuffer(graph.indptr, dtype=np.int64)
+    indices = np.frombuffer(graph.indices, dtype=np.int64)
+    distances = np.full(len(graph.node_ids), -1, dtype=np.int64)
+    frontier = np.unique(np.fromiter((graph.index[node] for node in sources), dtype=np.int64))
+    distances[frontier] = 0
+    level = 0
+    while frontier.size and (max_depth is None or level < max_depth):
+        # Gather the edge positions of every frontier node in one pass:
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            break
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        neighbors = indices[offsets + np.arange(total, dtype=np.int64)]
+        # Keep the unvisited neighbors, each one only once:
+        frontier = np.unique(neighbors[distances[neighbors] < 0])
+        level += 1
+        distances[frontier] = level
+    return distances
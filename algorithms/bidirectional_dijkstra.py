@@ -0,0 +1,68 @@
+"""
+Bidirectional Dijkstra's Algorithm
+
+This algorithm finds the shortest path between two nodes of a weighted graph with non-negative weights.
+It runs one search forward from start and one backward from goal (following edges in reverse), always
+advancing the side with the smaller frontier distance, and stops when the two frontiers can no longer
+improve the best meeting point found. Both searches only cover about half the radius of a single one.
+
+Parameters:
+- graph: A weighted Graph object that provides get_neighbors and get_predecessors methods,
+  or a CSRGraph from Graph.freeze().
+- start: The node from which to start the search.
+- goal: The node to reach.
+
+Returns:
+- [distance, path_edges], or None if goal can't be reached.
+"""
+
+import heapq
+from utils.errors import NodeNotFoundError
+
+def bidirectional_dijkstra(graph, start, goal):
+    for node in (start, goal):
+        if node not in graph.nodes:
+            raise NodeNotFoundError(node)
+    if start == goal:
+        return [0, []]
+    # Index 0 is the forward search and index 1 the backward one:
+    expand = (graph.get_neighbors, graph.get_predecessors)
+    distances = ({start: 0}, {goal: 0})
+    predecessors = ({start: None}, {goal: None})
+    queues = ([(0, start)], [(0, goal)])
+    best_distance = float('inf')
+    meeting_node = None
+    while queues[0] and queues[1]:
+        # Stop when no path through the frontiers can beat the best one found:
+        if queues[0][0][0] + queues[1][0][0] >= best_distance:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        current_distance, current_node = heapq.heappop(queues[side])
+        if current_distance > distances[side][current_node]:
+            continue
+        other_distances = distances[1 - side]
+        for neighbor, weight in expand[side](current_node):
+            distance = current_distance + weight
+            if distance < distances[side].get(neighbor, float('inf')):
+                distances[side][neighbor] = distance
+                predecessors[side][neighbor] = current_node
+                heapq.heappush(queues[side], (distance, neighbor))
+            # Check if the path through this node meets the other search:
+            if neighbor in other_distances:
+                total = distances[side][neighbor] + other_distances[neighbor]
+                if total < best_distance:
+                    best_distance = total
+                    meeting_node = neighbor
+    if meeting_node is None:
+        return None # No path exists to goal:
+    path = []
+    current = meeting_node
+    while current is not None:
+        path.append(current)
+        current = predecessors[0][current]
+    path.reverse()
+    current = predecessors[1][meeting_node]
+    while current is not None:
+        path.append(current)
+        current = predecessors[1][current]
+    return [best_distance, [(path[i], path[i+1]) for i in range(len(path)-1)]]
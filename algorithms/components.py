@@ -0,0 +1,139 @@
+"""
+Connected Components
+
+These functions label every node with the id of its component, as an int64 NumPy array aligned
+with the node order of the graph (list(graph.nodes)). Components are numbered from 0 in the order
+of their first node. The labels are cached on the graph and reused until its next mutation,
+so they are read-only.
+
+- connected_components(graph): Connected components built with union-find. Directed edges are
+  followed both ways, which gives the weakly connected components. Frozen graphs are processed
+  with NumPy: every edge hooks the larger of its two roots under the smaller one, then the
+  parent pointers are compressed by pointer jumping, until no edge joins two roots.
+- strongly_connected_components(graph): Strongly connected components of a directed graph,
+  with an iterative version of Tarjan's algorithm (no recursion limit on long paths). For an
+  undirected graph they are the connected components.
+
+Parameters:
+- graph: A Graph object, or a CSRGraph from Graph.freeze().
+
+Returns:
+- An int64 NumPy array with the component of each node.
+"""
+
+import numpy as np
+from graph import CSRGraph
+from .kruskal import UnionFind
+
+def connected_components(graph):
+    return _cached(graph, "connected", _connected_components)
+
+def strongly_connected_components(graph):
+    if not graph.directed:
+        return connected_components(graph)
+    return _cached(graph, "strong", _strongly_connected_components)
+
+def _cached(graph, kind, compute):
+    # Labels are stored with the version of the graph they were computed for:
+    version = getattr(graph, "version", None)
+    cached = graph._components.get(kind)
+    if cached is None or cached[0] != version:
+        labels = compute(graph)
+        labels.flags.writeable = False
+        cached = graph._components[kind] = (version, labels)
+    return cached[1]
+
+def _connected_components(graph):
+    if isinstance(graph, CSRGraph):
+        return _connected_components_csr(graph)
+    uf = UnionFind(graph.nodes)
+    for node in graph.nodes:
+        for neighbor, _ in graph.get_neighbors(node):
+            uf.union(node, neighbor)
+    return _relabel(np.array([uf.find_index(i) for i in range(len(uf.nodes))], dtype=np.int64))
+
+def _connected_components_csr(graph):
+    num_nodes = len(graph.node_ids)
+    indptr = np.frombuffer(graph.indptr, dtype=np.int64)
+    destinations = np.frombuffer(graph.indices, dtype=np.int64)
+    origins = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(indptr))
+    parent = np.arange(num_nodes, dtype=np.int64)
+    while True:
+        # Hook: point the larger root of every edge at the smaller one:
+        root_origins, root_destinations = parent[origins], parent[destinations]
+        joining = root_origins != root_destinations
+        if not joining.any():
+            break
+        low = np.minimum(root_origins[joining], root_destinations[joining])
+        high = np.maximum(root_origins[joining], root_destinations[joining])
+        np.minimum.at(parent, high, low)
+        # Compress: jump pointers until every node points at its root:
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        # Only keep the edges that still join two trees:
+        origins, destinations = origins[joining], destinations[joining]
+    return _relabel(parent)
+
+def _strongly_connected_components(graph):
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    indptr, indices = graph.indptr, graph.indices
+    num_nodes = len(graph.node_ids)
+    order = [-1] * num_nodes # Discovery index of each node
+    low = [0] * num_nodes
+    on_stack = bytearray(num_nodes)
+    labels = [-1] * num_nodes
+    stack = []
+    counter = 0
+    component = 0
+    for root in range(num_nodes):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, indptr[root])] # (node, position of its next edge)
+        while work:
+            node, p = work[-1]
+            end = indptr[node + 1]
+            while p < end:
+                neighbor = indices[p]
+                p += 1
+                if order[neighbor] == -1:
+                    # Descend into neighbor, resuming node from p afterwards:
+                    work[-1] = (node, p)
+                    order[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    work.append((neighbor, indptr[neighbor]))
+                    break
+                if on_stack[neighbor] and order[neighbor] < low[node]:
+                    low[node] = order[neighbor]
+            else:
+                # All edges of node are done:
+                work.pop()
+                if low[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        labels[member] = component
+                        if member == node:
+                            break
+                    component += 1
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+    return _relabel(np.array(labels, dtype=np.int64))
+
+def _relabel(roots):
+    # Number the components from 0 in the order of their first node:
+    _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(first))
+    return rank[inverse.reshape(-1)]
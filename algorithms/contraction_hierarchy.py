@@ -0,0 +1,312 @@
+"""
+Contraction Hierarchies
+
+This preprocessing technique speeds up shortest path queries on static weighted graphs with
+non-negative weights. Nodes are contracted one by one, least important first: when a node is
+removed, a shortcut edge is added between each pair of its neighbors whose shortest path went
+through it. Each node gets the rank of its contraction. A query then runs a bidirectional
+Dijkstra where both searches only follow edges towards higher ranked nodes, which settles a
+few hundred nodes even on very large road-like graphs.
+
+Parameters:
+- graph: A weighted Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight),
+  or a CSRGraph from Graph.freeze().
+- witness_limit: Maximum number of nodes settled by each witness search during preprocessing. Lower
+  values make the preprocessing faster but can add unnecessary shortcuts.
+
+Returns:
+- A ContractionHierarchy with distance(start, goal) and shortest_path(start, goal) queries. The
+  latter returns [distance, path_edges] or None, like dijkstra(graph, start, goal). The hierarchy
+  can be written with save(path) and read back with ContractionHierarchy.load(path).
+"""
+
+import heapq
+import struct
+import sys
+from array import array
+from graph import DIRECTED, FLOAT_WEIGHTS, BIG_ENDIAN, INTEGER_IDS, _encode_node_ids, _decode_node_ids
+from utils.errors import NodeNotFoundError
+
+# Binary format written by save() and read by load(), laid out like the graph files of graph.py:
+# a header, the node ids (an int64 array or a JSON array), then int64 arrays for the ranks, the
+# upward and downward edges as CSR offsets, targets and weights, and the shortcuts as parallel
+# origin, destination and middle node arrays. Nothing in the file is executed on load:
+FORMAT_MAGIC = b"GRAPHCH\0"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQQ") # magic, version, flags, nodes, upward edges, downward edges, shortcuts, node id size
+
+class ContractionHierarchy:
+
+    def __init__(self, node_ids, rank, upward, downward, middle, directed):
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.rank = rank
+        self.upward = upward # upward[u]: (v, weight) edges u -> v with rank[v] > rank[u]
+        self.downward = downward # downward[v]: (u, weight) edges u -> v with rank[u] > rank[v]
+        self.middle = middle # (u, v) -> contracted node of the shortcut u -> v
+        self.directed = directed
+
+    def distance(self, start, goal):
+        result = self._query(start, goal)
+        return float('inf') if result is None else result[0]
+
+    def shortest_path(self, start, goal):
+        result = self._query(start, goal)
+        if result is None:
+            return None # No path exists to goal:
+        distance, meeting_node, predecessors = result
+        # Rebuild the path through the meeting node, then expand the shortcuts:
+        hierarchy_path = []
+        current = meeting_node
+        while current is not None:
+            hierarchy_path.append(current)
+            current = predecessors[0][current]
+        hierarchy_path.reverse()
+        current = predecessors[1][meeting_node]
+        while current is not None:
+            hierarchy_path.append(current)
+            current = predecessors[1][current]
+        path = [hierarchy_path[0]]
+        for i in range(len(hierarchy_path) - 1):
+            path.extend(self._unpack(hierarchy_path[i], hierarchy_path[i + 1]))
+        node_ids = self.node_ids
+        return [distance, [(node_ids[path[i]], node_ids[path[i + 1]]) for i in range(len(path) - 1)]]
+
+    def _unpack(self, origin, destination):
+        # Replace a shortcut by the edges it stands for, returning the nodes after origin:
+        nodes = []
+        stack = [(origin, destination)]
+        while stack:
+            u, v = stack.pop()
+            w = self.middle.get((u, v))
+            if w is None:
+                nodes.append(v)
+            else:
+                stack.append((w, v))
+                stack.append((u, w))
+        return nodes
+
+    def _query(self, start, goal):
+        for node in (start, goal):
+            if node not in self.index:
+                raise NodeNotFoundError(node)
+        source, target = self.index[start], self.index[goal]
+        if source == target:
+            return 0, source, ({source: None}, {target: None})
+        # Index 0 is the forward search and index 1 the backward one:
+        expand = (self.upward, self.downward)
+        distances = ({source: 0}, {target: 0})
+        predecessors = ({source: None}, {target: None})
+        queues = ([(0, source)], [(0, target)])
+        best_distance = float('inf')
+        meeting_node = None
+        while queues[0] or queues[1]:
+            # Each side stops on its own once its frontier can't improve the best meeting point:
+            for side in (0, 1):
+                queue = queues[side]
+                if queue and queue[0][0] >= best_distance:
+                    queue.clear()
+            if not queues[0] and not queues[1]:
+                break
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            current_distance, current_node = heapq.heappop(queues[side])
+            if current_distance > distances[side][current_node]:
+                continue
+            other_distance = distances[1 - side].get(current_node)
+            if other_distance is not None and current_distance + other_distance < best_distance:
+                best_distance = current_distance + other_distance
+                meeting_node = current_node
+            for neighbor, weight in expand[side][current_node]:
+                distance = current_distance + weight
+                if distance < distances[side].get(neighbor, float('inf')):
+                    distances[side][neighbor] = distance
+                    predecessors[side][neighbor] = current_node
+                    heapq.heappush(queues[side], (distance, neighbor))
+        if meeting_node is None:
+            return None
+        return best_distance, meeting_node, predecessors
+
+    def save(self, path):
+        # Node ids must be integers, strings or other JSON values:
+        num_nodes = len(self.node_ids)
+        integer_ids, id_section = _encode_node_ids(list(self.node_ids))
+        flags = (DIRECTED if self.directed else 0) | (INTEGER_IDS if integer_ids else 0)
+        if sys.byteorder == "big":
+            flags |= BIG_ENDIAN
+        up_indptr, up_targets, up_weights = _flatten(self.upward)
+        down_indptr, down_targets, down_weights = _flatten(self.downward)
+        try:
+            up_weights, down_weights = array("q", up_weights), array("q", down_weights)
+        except (TypeError, OverflowError):
+            flags |= FLOAT_WEIGHTS
+            up_weights, down_weights = array("d", up_weights), array("d", down_weights)
+        sections = [
+            array("q", self.rank), up_indptr, up_targets, up_weights, down_indptr, down_targets, down_weights,
+            array("q", [u for u, _ in self.middle]), array("q", [v for _, v in self.middle]), array("q", self.middle.values()),
+        ]
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, flags, num_nodes, len(up_targets),
+                                   len(down_targets), len(self.middle), len(id_section)))
+            file.write(id_section)
+            file.write(bytes(-len(id_section) % 8))
+            for values in sections:
+                file.write(values)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            buffer = memoryview(file.read())
+        if len(buffer) < HEADER.size or buffer[:len(FORMAT_MAGIC)] != FORMAT_MAGIC:
+            raise ValueError(f"'{path}' is not a contraction hierarchy file.")
+        _, version, flags, num_nodes, num_upward, num_downward, num_shortcuts, id_size = HEADER.unpack_from(buffer)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported contraction hierarchy version {version}, expected {FORMAT_VERSION}.")
+        weight_typecode = "d" if flags & FLOAT_WEIGHTS else "q"
+        layout = [("q", num_nodes), ("q", num_nodes + 1), ("q", num_upward), (weight_typecode, num_upward),
+                  ("q", num_nodes + 1), ("q", num_downward), (weight_typecode, num_downward),
+                  ("q", num_shortcuts), ("q", num_shortcuts), ("q", num_shortcuts)]
+        offset = HEADER.size + id_size + (-id_size % 8)
+        if len(buffer) < offset + 8 * sum(length for _, length in layout):
+            raise ValueError(f"'{path}' is truncated.")
+        swap = bool(flags & BIG_ENDIAN) != (sys.byteorder == "big")
+        node_ids = _decode_node_ids(buffer[HEADER.size:HEADER.size + id_size], flags & INTEGER_IDS, swap)
+        if len(node_ids) != num_nodes:
+            raise ValueError(f"'{path}' has a corrupted node id section.")
+        sections = []
+        for typecode, length in layout:
+            values = array(typecode, buffer[offset:offset + 8 * length].tobytes())
+            if swap:
+                values.byteswap()
+            sections.append(values.tolist())
+            offset += 8 * length
+        rank, up_indptr, up_targets, up_weights, down_indptr, down_targets, down_weights, origins, destinations, middles = sections
+        upward = [list(zip(up_targets[up_indptr[u]:up_indptr[u + 1]], up_weights[up_indptr[u]:up_indptr[u + 1]]))
+                  for u in range(num_nodes)]
+        downward = [list(zip(down_targets[down_indptr[v]:down_indptr[v + 1]], down_weights[down_indptr[v]:down_indptr[v + 1]]))
+                    for v in range(num_nodes)]
+        middle = dict(zip(zip(origins, destinations), middles))
+        return cls(node_ids, rank, upward, downward, middle, bool(flags & DIRECTED))
+
+    def __repr__(self):
+        shortcuts = len(self.middle)
+        return f"ContractionHierarchy(nodes={len(self.node_ids)}, shortcuts={shortcuts})"
+
+
+def _flatten(adjacency):
+    # CSR offsets, targets and weights of lists of (target, weight) edges:
+    indptr = array("q", [0])
+    targets = array("q")
+    weights = []
+    for edges in adjacency:
+        targets.extend(target for target, _ in edges)
+        weights.extend(weight for _, weight in edges)
+        indptr.append(len(targets))
+    return indptr, targets, weights
+
+def build_contraction_hierarchy(graph, witness_limit=100):
+    node_ids = list(graph.nodes)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    num_nodes = len(node_ids)
+    # Remaining graph, keeping only the lightest of parallel edges and dropping self-loops:
+    outgoing = [{} for _ in range(num_nodes)]
+    incoming = [{} for _ in range(num_nodes)]
+    for node_id in node_ids:
+        u = index[node_id]
+        for neighbor, weight in graph.get_neighbors(node_id):
+            if weight < 0:
+                raise ValueError("Contraction hierarchies need non-negative weights.")
+            v = index[neighbor]
+            if u != v and weight < outgoing[u].get(v, float('inf')):
+                outgoing[u][v] = weight
+                incoming[v][u] = weight
+    # Every edge of the hierarchy (original or shortcut) with its weight:
+    edges = {(u, v): weight for u in range(num_nodes) for v, weight in outgoing[u].items()}
+    middle = {}
+    contracted = bytearray(num_nodes)
+    contracted_neighbors = [0] * num_nodes
+
+    def _witness_distances(source, excluded, targets):
+        # Limited Dijkstra in the remaining graph, skipping the node being contracted.
+        # It stops once every target is settled or farther than its shortcut would be:
+        max_distance = max(targets.values())
+        remaining = len(targets)
+        distances = {source: 0}
+        priority_queue = [(0, source)]
+        settled = 0
+        while priority_queue and settled < witness_limit:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            if current_distance > max_distance:
+                break
+            if current_node in targets:
+                remaining -= 1
+                if not remaining:
+                    break
+            settled += 1
+            for neighbor, weight in outgoing[current_node].items():
+                if neighbor == excluded:
+                    continue
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        return distances
+
+    def _shortcuts(node):
+        # Shortcuts needed to remove node while keeping the distances between its neighbors:
+        shortcuts = []
+        for u, in_weight in incoming[node].items():
+            targets = {w: in_weight + out_weight for w, out_weight in outgoing[node].items() if w != u}
+            if not targets:
+                continue
+            distances = _witness_distances(u, node, targets)
+            for w, weight in targets.items():
+                if distances.get(w, float('inf')) > weight:
+                    shortcuts.append((u, w, weight))
+        return shortcuts
+
+    def _priority(node, shortcuts):
+        # Edge difference plus the number of contracted neighbors, to spread the contractions:
+        return len(shortcuts) - len(incoming[node]) - len(outgoing[node]) + contracted_neighbors[node]
+
+    priority_queue = [(_priority(node, _shortcuts(node)), node) for node in range(num_nodes)]
+    heapq.heapify(priority_queue)
+    rank = [0] * num_nodes
+    next_rank = 0
+    while priority_queue:
+        _, node = heapq.heappop(priority_queue)
+        if contracted[node]:
+            continue
+        # Lazy update: recompute the priority and put the node back if it is no longer the smallest:
+        shortcuts = _shortcuts(node)
+        priority = _priority(node, shortcuts)
+        if priority_queue and priority > priority_queue[0][0]:
+            heapq.heappush(priority_queue, (priority, node))
+            continue
+        for u, w, weight in shortcuts:
+            if weight < outgoing[u].get(w, float('inf')):
+                outgoing[u][w] = weight
+                incoming[w][u] = weight
+                edges[u, w] = weight
+                middle[u, w] = node
+        for neighbor in set(incoming[node]) | set(outgoing[node]):
+            outgoing[neighbor].pop(node, None)
+            incoming[neighbor].pop(node, None)
+            contracted_neighbors[neighbor] += 1
+        outgoing[node] = {}
+        incoming[node] = {}
+        contracted[node] = 1
+        rank[node] = next_rank
+        next_rank += 1
+    upward = [[] for _ in range(num_nodes)]
+    downward = [[] for _ in range(num_nodes)]
+    for (u, v), weight in edges.items():
+        if rank[v] > rank[u]:
+            upward[u].append((v, weight))
+        else:
+            downward[v].append((u, weight))
+    return ContractionHierarchy(node_ids, rank, upward, downward, middle, graph.directed)
@@ -5,25 +5,60 @@ This algorithm explores as far as possible along each branch before backtracking
 It is useful for exploring a graph's depth and detecting cycles.
 
 Parameters:
-- graph: Graph object that provides a get_neighbors method.
+- graph: Graph object that provides a get_neighbors method, or a CSRGraph from Graph.freeze().
 - start_node: The node from which to start the traversal.
 
 Returns:
-- List of nodes in the order they were visited.
+- List of nodes in the order they were visited. iter_dfs(graph, start) yields the
+  same nodes lazily, so the traversal can be stopped early.
 """
 
-from graph import Graph
+from graph import CSRGraph
 
 def dfs(graph, start):
+    return list(iter_dfs(graph, start))
+
+def iter_dfs(graph, start):
     if start not in graph.nodes:
-        return []
-    visited = set()
-    path = []
-    def _dfs(node):
-        visited.add(node)
-        path.append(node)
-        for neighbor, _ in graph.get_neighbors(node):
+        return
+    if isinstance(graph, CSRGraph):
+        yield from _iter_dfs_csr(graph, start)
+        return
+    # Iterative version: the stack holds the neighbor iterator of each node on the
+    # current branch, so the visit order matches the recursive traversal and long
+    # paths don't hit the recursion limit:
+    visited = {start}
+    yield start
+    stack = [iter(graph.get_neighbors(start))]
+    while stack:
+        for neighbor, _ in stack[-1]:
             if neighbor not in visited:
-                _dfs(neighbor)
-    _dfs(start)
-    return path
+                visited.add(neighbor)
+                yield neighbor
+                stack.append(iter(graph.get_neighbors(neighbor)))
+                break
+        else:
+            stack.pop()
+
+def _iter_dfs_csr(graph, start):
+    # Same traversal over a frozen graph, each stack entry keeps the position
+    # of the next edge to explore:
+    indptr, indices, node_ids = graph.indptr, graph.indices, graph.node_ids
+    visited = bytearray(len(node_ids))
+    source = graph.index[start]
+    visited[source] = 1
+    yield start
+    stack = [(source, indptr[source])]
+    while stack:
+        node, p = stack[-1]
+        end = indptr[node + 1]
+        while p < end and visited[indices[p]]:
+            p += 1
+        if p == end:
+            stack.pop()
+            continue
+        neighbor = indices[p]
+        stack[-1] = (node, p + 1)
+        visited[neighbor] = 1
+        yield node_ids[neighbor]
+        stack.append((neighbor, indptr[neighbor]))
@@ -5,57 +5,269 @@ This algorithm finds the shortest path from a starting node to all other nodes i
 It only works with non-negative weights.
 
 Parameters:
-- graph: A weighted Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight).
+- graph: A weighted Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight),
+  or a CSRGraph from Graph.freeze().
 - start_node: The node from which to start the traversal.
+- end_node: Optional target. The search stops as soon as it is settled.
+- lazy: If True (and no end_node is given), return a ShortestPathTree holding only the
+  distances and the predecessor map. Paths are rebuilt on demand when a node is looked up.
 
 Returns:
-- A dictionary with each node as a key and the minimum distance from start_node as the value.
+- With end_node: [distance, path_edges], or None if end_node can't be reached.
+- Otherwise, a dictionary with each reachable node as a key and [distance, path_edges] as the value.
+
+Batch queries:
+- dijkstra_many(graph, pairs) answers a list of (start_node, end_node) pairs, returning one
+  dijkstra(graph, start_node, end_node) result per pair.
+- distance_matrix(graph, sources, targets=None) returns a list of rows with the distance from
+  each source to each target (float('inf') when unreachable). All nodes are targets by default.
+Queries are grouped by source, each search stops once all the targets of its source are
+settled, and the scratch buffers are reused between searches.
 """
 
 import heapq
+from collections.abc import Mapping
+from graph import CSRGraph
+from utils.errors import NodeNotFoundError
+
+class ShortestPathTree(Mapping):
+    # Result of a single-source search: maps each reached node to [distance, path_edges],
+    # building the path only when the node is looked up
+
+    def __init__(self, source, distances, predecessors):
+        self.source = source
+        self.distances = distances
+        self.predecessors = predecessors
+
+    def distance_to(self, node):
+        return self.distances.get(node, float('inf'))
+
+    def path_to(self, node):
+        if node not in self.distances:
+            return None
+        path = []
+        current = node
+        while current is not None:
+            path.append(current)
+            current = self.predecessors[current]
+        path.reverse()
+        return [(path[i], path[i+1]) for i in range(len(path)-1)]
+
+    def __getitem__(self, node):
+        if node not in self.distances:
+            raise KeyError(node)
+        return [self.distances[node], self.path_to(node)]
+
+    def __iter__(self):
+        return iter(self.distances)
+
+    def __len__(self):
+        return len(self.distances)
+
+    def __contains__(self, node):
+        return node in self.distances
+
+    def __repr__(self):
+        return f"ShortestPathTree(source={self.source}, nodes={len(self.distances)})"
+
+def dijkstra(graph, start_node, end_node=None, lazy=False):
+    if start_node not in graph.nodes:
+        raise NodeNotFoundError(start_node)
+    if isinstance(graph, CSRGraph):
+        distances, predecessors = _search_csr(graph, start_node, end_node)
+    else:
+        distances, predecessors = _search(graph, start_node, end_node)
+    tree = ShortestPathTree(start_node, distances, predecessors)
+    # If end_node is provided, reconstruct only the path to end_node:
+    if end_node is not None:
+        if end_node not in distances:
+            return None # No path exists to end_node:
+        return [distances[end_node], tree.path_to(end_node)]
+    if lazy:
+        return tree
+    # If no end_node is provided, return paths for all nodes:
+    return {node: tree[node] for node in graph.nodes if node in distances}
 
-def dijkstra(graph, start_node, end_node=None):
-    distances = {node_id: float('inf') for node_id in graph.nodes}
-    distances[start_node] = 0
+def _search(graph, start_node, end_node=None):
+    # Only reached nodes get an entry, so the setup cost doesn't depend on the graph size:
+    distances = {start_node: 0}
+    predecessors = {start_node: None} # Store the predecessor of each node
     priority_queue = [(0, start_node)] # (distance, node)
-    predecessors = {node_id: None for node_id in graph.nodes} # Store the predecessor of each node
     # Algorithm loop:
     while priority_queue:
         current_distance, current_node = heapq.heappop(priority_queue)
         # If the distance is greater than the recorded, skip:
         if current_distance > distances[current_node]:
             continue
+        # The distance to end_node is final once it is popped:
+        if current_node == end_node:
+            break
         # Explore neighbors:
         for neighbor, weight in graph.get_neighbors(current_node):
             distance = current_distance + weight
             # Update if a shorter path is found:
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+    if end_node is not None and current_node != end_node:
+        distances.pop(end_node, None)
+    return distances, predecessors
+
+def _search_csr(graph, start_node, end_node=None):
+    # Same search over the dense integer ids of a frozen graph:
+    indptr, indices, weights, node_ids = graph.indptr, graph.indices, graph.weights, graph.node_ids
+    source = graph.index[start_node]
+    target = graph.index.get(end_node, -1)
+    distances = [float('inf')] * len(node_ids)
+    predecessors = [-1] * len(node_ids)
+    distances[source] = 0
+    reached = [source]
+    priority_queue = [(0, source)]
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_distance > distances[current_node]:
+            continue
+        if current_node == target:
+            break
+        for p in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[p]
+            distance = current_distance + weights[p]
             if distance < distances[neighbor]:
+                if distances[neighbor] == float('inf'):
+                    reached.append(neighbor)
                 distances[neighbor] = distance
                 predecessors[neighbor] = current_node
                 heapq.heappush(priority_queue, (distance, neighbor))
-    # If end_node is provided, reconstruct only the path to end_node:
-    if end_node is not None:
+    if target != -1 and current_node != target:
+        reached = [node for node in reached if node != target]
+    return (
+        {node_ids[node]: distances[node] for node in reached},
+        {node_ids[node]: node_ids[predecessors[node]] if predecessors[node] != -1 else None for node in reached}
+    )
+
+def dijkstra_many(graph, pairs):
+    pairs = list(pairs)
+    targets_by_source = {}
+    for start_node, end_node in pairs:
+        targets_by_source.setdefault(start_node, []).append(end_node)
+    results = {}
+    for start_node, distance_of, path_to in _batched_search(graph, targets_by_source):
+        for end_node in targets_by_source[start_node]:
+            distance = distance_of(end_node)
+            if distance == float('inf'):
+                results[start_node, end_node] = None # No path exists to end_node:
+            else:
+                results[start_node, end_node] = [distance, path_to(end_node)]
+    return [results[pair] for pair in pairs]
+
+def distance_matrix(graph, sources, targets=None):
+    sources = list(sources)
+    targets = list(graph.nodes) if targets is None else list(targets)
+    rows = {}
+    for start_node, distance_of, _ in _batched_search(graph, {source: targets for source in sources}):
+        rows[start_node] = [distance_of(node) for node in targets]
+    return [list(rows[source]) for source in sources]
+
+def _batched_search(graph, targets_by_source):
+    # Yield (source, distance_of, path_to) once per source. The lookups are only valid
+    # until the next source is searched, since the buffers behind them are reused:
+    for node in (node for targets in targets_by_source.values() for node in targets):
+        if node not in graph.nodes:
+            raise NodeNotFoundError(node)
+    if isinstance(graph, CSRGraph):
+        yield from _batched_search_csr(graph, targets_by_source)
+        return
+    distances = {}
+    predecessors = {}
+    def _distance_of(node):
+        return distances.get(node, float('inf'))
+    def _path_to(node):
         path = []
-        current = end_node
+        current = node
         while current is not None:
             path.append(current)
             current = predecessors[current]
         path.reverse()
-        # Return the path to end_node along with its distance:
-        if path[0] == start_node:
-            return [distances[end_node], [(path[i], path[i+1]) for i in range(len(path)-1)]]
-        else:
-            return None # No path exists to end_node:
-    # If no end_node is provided, return paths for all nodes:
-    paths = {}
-    for node in graph.nodes:
+        return [(path[i], path[i+1]) for i in range(len(path)-1)]
+    for start_node, targets in targets_by_source.items():
+        if start_node not in graph.nodes:
+            raise NodeNotFoundError(start_node)
+        distances.clear()
+        predecessors.clear()
+        distances[start_node] = 0
+        predecessors[start_node] = None
+        remaining = set(targets)
+        priority_queue = [(0, start_node)]
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            # Stop as soon as every target of this source is settled:
+            remaining.discard(current_node)
+            if not remaining:
+                break
+            for neighbor, weight in graph.get_neighbors(current_node):
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        yield start_node, _distance_of, _path_to
+
+def _batched_search_csr(graph, targets_by_source):
+    # Dense buffers are allocated once and only the touched entries are reset between searches:
+    indptr, indices, weights, node_ids, index = graph.indptr, graph.indices, graph.weights, graph.node_ids, graph.index
+    distances = [float('inf')] * len(node_ids)
+    predecessors = [-1] * len(node_ids)
+    is_target = bytearray(len(node_ids))
+    touched = []
+    def _distance_of(node):
+        return distances[index[node]]
+    def _path_to(node):
         path = []
-        current = node
-        while current is not None:
-            path.append(current)
+        current = index[node]
+        while current != -1:
+            path.append(node_ids[current])
             current = predecessors[current]
         path.reverse()
-        # Only include the path if it's not the start node:
-        if path[0] == start_node:
-            paths[node] = [distances[node], [(path[i], path[i+1]) for i in range(len(path)-1)]]
-    return paths  # Return distances along with paths
+        return [(path[i], path[i+1]) for i in range(len(path)-1)]
+    for start_node, targets in targets_by_source.items():
+        if start_node not in index:
+            raise NodeNotFoundError(start_node)
+        for node in touched:
+            distances[node] = float('inf')
+            predecessors[node] = -1
+        touched.clear()
+        remaining = 0
+        for node in targets:
+            target = index[node]
+            if not is_target[target]:
+                is_target[target] = 1
+                remaining += 1
+        source = index[start_node]
+        distances[source] = 0
+        touched.append(source)
+        priority_queue = [(0, source)]
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            if is_target[current_node]:
+                is_target[current_node] = 0
+                remaining -= 1
+                if not remaining:
+                    break
+            for p in range(indptr[current_node], indptr[current_node + 1]):
+                neighbor = indices[p]
+                distance = current_distance + weights[p]
+                if distance < distances[neighbor]:
+                    if distances[neighbor] == float('inf'):
+                        touched.append(neighbor)
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        # Clear the flags of targets that were never reached:
+        for node in targets:
+            is_target[index[node]] = 0
+        yield start_node, _distance_of, _path_to
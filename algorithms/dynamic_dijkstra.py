@@ -0,0 +1,142 @@
+"""
+Dynamic Dijkstra
+
+This keeps a single-source shortest path tree up to date while the graph changes, repairing only
+the part of the tree a mutation affects, in the spirit of Ramalingam and Reps' dynamic SSSP:
+- When an edge u -> v gets added (or lighter) and d(u) + w < d(v), v is improved and the
+  improvement is propagated with a Dijkstra search that only visits the nodes whose distance drops.
+- When a tree edge u -> v gets removed (or heavier), the subtree below v is detached. Each of its
+  nodes gets a tentative distance through its predecessors outside the subtree, then a Dijkstra
+  search limited to the subtree settles them again. Nodes that can't be reached are dropped.
+Removing or making heavier an edge that isn't in the tree costs nothing.
+The work is proportional to the affected nodes and their edges, instead of a full search.
+
+Parameters:
+- graph: A weighted Graph object with non-negative weights. The tree subscribes to its mutations.
+- source: The node the shortest paths start from.
+
+Returns:
+- A DynamicShortestPaths, a ShortestPathTree (like dijkstra(graph, source, lazy=True)) whose
+  distances, predecessors, distance_to(node) and path_to(node) always match the current graph.
+  close() stops following the graph.
+"""
+
+import heapq
+from .dijkstra import ShortestPathTree, dijkstra
+
+class DynamicShortestPaths(ShortestPathTree):
+
+    def __init__(self, graph, source):
+        tree = dijkstra(graph, source, lazy=True)
+        super().__init__(source, tree.distances, tree.predecessors)
+        self.graph = graph
+        self._children = {}
+        for node, parent in self.predecessors.items():
+            if parent is not None:
+                self._children.setdefault(parent, set()).add(node)
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        self.graph.unsubscribe(self._on_change)
+
+    def _on_change(self, event, *arguments):
+        if event == "add_edge":
+            origin, destination, weight = arguments
+            self._decrease(origin, destination, weight)
+            if not self.graph.directed:
+                self._decrease(destination, origin, weight)
+        elif event == "remove_edge":
+            self._tree_edge_lost(*arguments)
+        elif event == "set_weight":
+            origin, destination, old_weight, weight = arguments
+            if weight < old_weight:
+                self._on_change("add_edge", origin, destination, weight)
+            elif weight > old_weight:
+                self._tree_edge_lost(origin, destination)
+        elif event == "remove_node":
+            node_id, = arguments
+            if node_id == self.source:
+                self.distances.clear()
+                self.predecessors.clear()
+                self._children.clear()
+            elif node_id in self.distances:
+                self._increase([node_id])
+
+    def _tree_edge_lost(self, origin, destination):
+        # An edge got removed or heavier, which only matters if it is in the tree:
+        roots = [destination] if self.predecessors.get(destination) == origin else []
+        if not self.graph.directed and self.predecessors.get(origin) == destination:
+            roots.append(origin)
+        if roots:
+            self._increase(roots)
+
+    def _attach(self, node, parent):
+        previous = self.predecessors.get(node)
+        if previous is not None:
+            self._children[previous].discard(node)
+        self.predecessors[node] = parent
+        self._children.setdefault(parent, set()).add(node)
+
+    def _decrease(self, origin, destination, weight):
+        # Propagate the improvement through the edge, only visiting improved nodes:
+        distances = self.distances
+        if origin not in distances or distances[origin] + weight >= distances.get(destination, float('inf')):
+            return
+        distances[destination] = distances[origin] + weight
+        self._attach(destination, origin)
+        priority_queue = [(distances[destination], destination)]
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            for neighbor, edge_weight in self.graph.get_neighbors(current_node):
+                distance = current_distance + edge_weight
+                if distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    self._attach(neighbor, current_node)
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+    def _increase(self, roots):
+        # Detach the subtrees below roots, their nodes lost their shortest path:
+        distances, predecessors, children = self.distances, self.predecessors, self._children
+        affected = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(children.pop(node, ()))
+        for node in affected:
+            parent = predecessors.pop(node)
+            if parent is not None and parent not in affected:
+                children[parent].discard(node)
+            del distances[node]
+        # Tentative distances through the predecessors that kept theirs:
+        tentative = {}
+        parents = {}
+        for node in affected:
+            if node not in self.graph.nodes:
+                continue # Removed node
+            for predecessor, weight in self.graph.get_predecessors(node):
+                distance = distances.get(predecessor, float('inf')) + weight
+                if distance < tentative.get(node, float('inf')):
+                    tentative[node] = distance
+                    parents[node] = predecessor
+        # Dijkstra limited to the affected nodes:
+        priority_queue = [(distance, node) for node, distance in tentative.items()]
+        heapq.heapify(priority_queue)
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_node in distances or current_distance > tentative[current_node]:
+                continue
+            distances[current_node] = current_distance
+            self._attach(current_node, parents[current_node])
+            for neighbor, weight in self.graph.get_neighbors(current_node):
+                distance = current_distance + weight
+                if neighbor in affected and neighbor not in distances and distance < tentative.get(neighbor, float('inf')):
+                    tentative[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+    def __repr__(self):
+        return f"DynamicShortestPaths(source={self.source}, nodes={len(self.distances)})"
@@ -2,36 +2,107 @@
 Hierholzer's Algorithm
 
 This algorithm finds an Eulerian path or cycle in a graph. An Eulerian path visits every edge in the graph exactly once, and an Eulerian cycle is an Eulerian path that starts and ends at the same node. The algorithm works by following unused edges, backtracking when necessary, and ensuring that every edge is covered exactly once.
+Every node keeps a cursor to its next unused edge and every edge has an id, so the whole run is O(V+E) and parallel edges are supported.
 
 Parameters:
-- graph: An undirected Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight). The graph must have either all nodes with even degrees (Eulerian cycle) or exactly two nodes with odd degrees (Eulerian path).
-- start_node: The node from which to start the traversal. If the graph has an Eulerian cycle, this can be any node with an even degree. If it has an Eulerian path, this should be one of the two nodes with odd degrees.
+- graph: A directed or undirected Graph object that provides a get_neighbors method, where neighbors return (neighbor, weight), or a CSRGraph from Graph.freeze(). The graph must pass graph.has_eulerian_path(): for an undirected graph, either all nodes have even degrees (Eulerian cycle) or exactly two nodes have odd degrees (Eulerian path); for a directed graph, every node has as many incoming as outgoing edges (Eulerian cycle) except at most one start node with one extra outgoing edge and one end node with one extra incoming edge (Eulerian path).
+- start_node: Optional node from which to start the traversal. If the graph has an Eulerian cycle, this can be any node with edges. If it only has an Eulerian path, this must be the node the path starts from (one of the two odd degree nodes if undirected). When omitted, a valid start node is chosen automatically.
 
 Returns:
-- A list representing the Eulerian path or cycle. If no Eulerian path or cycle exists, it returns an empty list.
+- A list representing the Eulerian path or cycle. If no Eulerian path or cycle exists (from start_node), it returns None.
 """
 
 from collections import defaultdict
-from graph import Graph
+from graph import CSRGraph
 
-def hierholzer(graph, start_node):
-    # Check if the graph has either all even degrees (Eulerian cycle)
-    # or exactly two nodes with odd degrees (Eulerian path)
-    if all(len(graph.get_neighbors(node)) % 2 == 0 for node in graph.nodes) or \
-       sum(1 for node in graph.nodes if len(graph.get_neighbors(node)) % 2 != 0) == 2:
-        stack = [start_node]
-        path = []
-        used_edges = defaultdict(set) # To track visited edges
-        while stack:
-            node = stack[-1]
-            neighbors = graph.get_neighbors(node)
-            for neighbor, _ in neighbors:
-                if neighbor not in used_edges[node]: # Check if the edge has been used
-                    stack.append(neighbor)
-                    used_edges[node].add(neighbor)
-                    used_edges[neighbor].add(node)
-                    break
+def hierholzer(graph, start_node=None):
+    # Reuse the degree and connectivity checks of the graph, which also give a valid start:
+    valid_start = graph.eulerian_path_start()
+    if valid_start is None:
+        return None
+    if start_node is None:
+        start_node = valid_start
+    elif not _can_start(graph, start_node, valid_start):
+        return None
+    if isinstance(graph, CSRGraph):
+        return _hierholzer_csr(graph, start_node)
+    # Number the edges, the two stored copies of an undirected edge share the same id:
+    adjacency = {}
+    pending = defaultdict(list)
+    num_edges = 0
+    for node in graph.nodes:
+        neighbors = adjacency[node] = []
+        for neighbor, _ in graph.get_neighbors(node):
+            reverse = None if graph.directed else pending[(neighbor, node)]
+            if reverse:
+                edge_id = reverse.pop()
             else:
-                path.append(stack.pop())
-        return path[::-1] # Return reversed path to get the correct order
-    return None
+                edge_id = num_edges
+                num_edges += 1
+                if not graph.directed:
+                    pending[(node, neighbor)].append(edge_id)
+            neighbors.append((neighbor, edge_id))
+    used = bytearray(num_edges)
+    cursor = dict.fromkeys(adjacency, 0)
+    stack = [start_node]
+    path = []
+    while stack:
+        node = stack[-1]
+        neighbors = adjacency[node]
+        i = cursor[node]
+        while i < len(neighbors) and used[neighbors[i][1]]:
+            i += 1
+        if i == len(neighbors):
+            cursor[node] = i
+            path.append(stack.pop())
+            continue
+        neighbor, edge_id = neighbors[i]
+        used[edge_id] = 1
+        cursor[node] = i + 1
+        stack.append(neighbor)
+    return path[::-1] # Return reversed path to get the correct order
+
+def _can_start(graph, start_node, valid_start):
+    # Any node with edges can start an Eulerian cycle, otherwise the path has fixed ends:
+    if start_node not in graph.nodes or not graph.out_degree(start_node):
+        return False
+    if graph.has_eulerian_cycle():
+        return True
+    if graph.directed:
+        return start_node == valid_start
+    return graph.out_degree(start_node) % 2 != 0
+
+def _hierholzer_csr(graph, start_node):
+    # Same algorithm over a frozen graph: the cursors and used flags are indexed by
+    # edge position, and undirected edges are paired with their mirror copy:
+    indptr, indices, node_ids = graph.indptr, graph.indices, graph.node_ids
+    used = bytearray(len(indices))
+    mirror = None
+    if not graph.directed:
+        mirror = [0] * len(indices)
+        pending = defaultdict(list)
+        for node in range(len(node_ids)):
+            for p in range(indptr[node], indptr[node + 1]):
+                reverse = pending[(indices[p], node)]
+                if reverse:
+                    q = reverse.pop()
+                    mirror[p], mirror[q] = q, p
+                else:
+                    pending[(node, indices[p])].append(p)
+    cursor = list(indptr[:-1])
+    stack = [graph.index[start_node]]
+    path = []
+    while stack:
+        node = stack[-1]
+        p, end = cursor[node], indptr[node + 1]
+        while p < end and used[p]:
+            p += 1
+        cursor[node] = p
+        if p == end:
+            path.append(node_ids[stack.pop()])
+            continue
+        used[p] = 1
+        if mirror is not None:
+            used[mirror[p]] = 1
+        stack.append(indices[p])
+    return path[::-1]
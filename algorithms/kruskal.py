@@ -5,44 +5,118 @@ This algorithm finds the Minimum Spanning Tree (MST) for a connected, undirected
 It sorts all edges by weight and adds edges to the MST as long as they don't form a cycle.
 
 Parameters:
-- graph: A Graph object that provides edges with weights in (origin, destination, weight) format.
+- graph: A Graph object that provides edges with weights in (origin, destination, weight) format,
+  or a CSRGraph from Graph.freeze().
 
 Returns:
 - A list of edges that form the MST.
+
+Streaming mode:
+- kruskal_stream(edges, num_nodes=None) takes an iterable of (origin, destination, weight) tuples
+  already sorted by weight and consumes it lazily, so the edge list never has to be in memory.
+  When num_nodes is given, it stops reading as soon as the tree has num_nodes - 1 edges.
 """
 
-from graph import Edge
+from graph import Edge, CSRGraph
 
 class UnionFind:
-    def __init__(self):
-        self.parent = {}
+    # Array-backed disjoint sets: nodes are mapped to dense integers, trees are merged
+    # by rank and paths are compressed without recursion
+
+    def __init__(self, nodes=()):
+        self.index = {}
+        self.nodes = []
+        self.parent = []
+        self.rank = bytearray()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node not in self.index:
+            self.index[node] = len(self.nodes)  # Initialize parent
+            self.parent.append(len(self.nodes))
+            self.nodes.append(node)
+            self.rank.append(0)
+
     def find(self, node):
-        if self.parent[node] != node:
-            self.parent[node] = self.find(self.parent[node])  # Path compression
-        return self.parent[node]
+        return self.nodes[self.find_index(self.index[node])]
+
     def union(self, node1, node2):
-        root1 = self.find(node1)
-        root2 = self.find(node2)
-        if root1 != root2:
-            self.parent[root2] = root1  # Union the trees
-    def add(self, node):
-        if node not in self.parent:
-            self.parent[node] = node  # Initialize parent
+        return self.union_index(self.index[node1], self.index[node2])
+
+    def find_index(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:  # Path compression
+            parent[i], i = root, parent[i]
+        return root
+
+    def union_index(self, i, j):
+        # Merge the sets of i and j, returning False if they were already the same:
+        root1 = self.find_index(i)
+        root2 = self.find_index(j)
+        if root1 == root2:
+            return False
+        rank = self.rank
+        if rank[root1] < rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1  # Union the trees
+        if rank[root1] == rank[root2]:
+            rank[root1] += 1
+        return True
 
 def kruskal(graph):
+    if isinstance(graph, CSRGraph):
+        return _kruskal_csr(graph)
+    # Undirected edges are stored once per direction, keeping the copy whose origin
+    # was added first gives every edge exactly once in a single pass:
+    position = {node: i for i, node in enumerate(graph.nodes)}
     edges = []
     for origin, edge_list in graph.edges.items():
         for edge in edge_list:
-            if graph.directed or (edge.destination, edge.origin, edge.weight) not in edges:
+            if graph.directed or position[origin] < position[edge.destination]:
                 edges.append((edge.origin, edge.destination, edge.weight))
     # Sort edges by weight
     edges.sort(key=lambda edge: edge[2])
+    return kruskal_stream(edges, len(graph.nodes))
+
+def kruskal_stream(edges, num_nodes=None):
     uf = UnionFind()
     mst = []
+    previous_weight = None
     for origin, destination, weight in edges:
+        if previous_weight is not None and weight < previous_weight:
+            raise ValueError("kruskal_stream needs the edges sorted by weight.")
+        previous_weight = weight
         uf.add(origin)
         uf.add(destination)
-        if uf.find(origin) != uf.find(destination):
-            uf.union(origin, destination)
+        if uf.union(origin, destination):
             mst.append(Edge(origin, destination, weight))
+            if num_nodes is not None and len(mst) >= num_nodes - 1:
+                break
+    return mst
+
+def _kruskal_csr(graph):
+    # Same algorithm over a frozen graph, with the union-find working on the dense ids.
+    # Undirected edges are stored in both directions, so only the i < j copy is kept:
+    indptr, indices, weights, node_ids = graph.indptr, graph.indices, graph.weights, graph.node_ids
+    origins = []
+    positions = []
+    for node in range(len(node_ids)):
+        for p in range(indptr[node], indptr[node + 1]):
+            if graph.directed or node < indices[p]:
+                origins.append(node)
+                positions.append(p)
+    order = sorted(range(len(positions)), key=lambda k: weights[positions[k]])
+    uf = UnionFind(range(len(node_ids)))
+    mst = []
+    for k in order:
+        origin, p = origins[k], positions[k]
+        destination = indices[p]
+        if uf.union_index(origin, destination):
+            mst.append(Edge(node_ids[origin], node_ids[destination], weights[p]))
+            if len(mst) == len(node_ids) - 1:
+                break
     return mst
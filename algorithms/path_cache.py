@@ -0,0 +1,109 @@
+"""
+Shortest Path Cache
+
+An opt-in, size-bounded LRU cache of single-source shortest path trees for graphs that get many
+queries from the same sources. Each cached tree is the lazy result of dijkstra(graph, source),
+valid for the current graph version. The cache subscribes to the mutations of the graph and only
+evicts the trees a mutation can actually change:
+- add_node never evicts.
+- add_edge(u, v, w) evicts the trees where u is reached and d(u) + w < d(v).
+- remove_edge(u, v) evicts the trees where u -> v is a tree edge.
+- set_weight(u, v, w) evicts like add_edge when the weight drops, and like remove_edge when it
+  grows, so heavier edges off the tree never evict.
+- remove_node(x) evicts the trees where x is reached.
+(Undirected edges are checked in both directions.)
+
+Parameters:
+- graph: A weighted Graph object, or a CSRGraph (which never changes, so nothing is evicted).
+- maxsize: Maximum number of cached trees, the least recently used one is dropped first.
+
+Usage:
+- cache.dijkstra(source, target=None) returns the same result as dijkstra(graph, source, target).
+- cache.tree(source) returns the cached ShortestPathTree of source.
+- cache.hits, cache.misses and cache.evictions count the lookups and invalidations, cache.info()
+  returns them with the current size. cache.close() stops following the graph.
+"""
+
+from collections import OrderedDict, namedtuple
+from .dijkstra import dijkstra
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+class ShortestPathCache:
+
+    def __init__(self, graph, maxsize=256):
+        self.graph = graph
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._trees = OrderedDict() # source -> ShortestPathTree, least recently used first
+        self._subscribed = hasattr(graph, "subscribe")
+        if self._subscribed:
+            graph.subscribe(self._on_change)
+
+    def tree(self, source):
+        tree = self._trees.get(source)
+        if tree is not None:
+            self.hits += 1
+            self._trees.move_to_end(source)
+            return tree
+        self.misses += 1
+        tree = dijkstra(self.graph, source, lazy=True)
+        self._trees[source] = tree
+        if len(self._trees) > self.maxsize:
+            self._trees.popitem(last=False)
+        return tree
+
+    def dijkstra(self, source, target=None):
+        tree = self.tree(source)
+        if target is None:
+            return {node: tree[node] for node in self.graph.nodes if node in tree}
+        if target not in tree:
+            return None # No path exists to target:
+        return [tree.distances[target], tree.path_to(target)]
+
+    def clear(self):
+        self._trees.clear()
+
+    def close(self):
+        if self._subscribed:
+            self.graph.unsubscribe(self._on_change)
+            self._subscribed = False
+        self.clear()
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._trees))
+
+    def _on_change(self, event, *arguments):
+        if event == "set_weight":
+            # A lighter edge acts like an added one, a heavier edge like a removed one:
+            origin, destination, old_weight, weight = arguments
+            if weight < old_weight:
+                event, arguments = "add_edge", (origin, destination, weight)
+            elif weight > old_weight:
+                event, arguments = "remove_edge", (origin, destination)
+        if event == "add_edge":
+            origin, destination, weight = arguments
+            affected = lambda tree: _improves(tree, origin, destination, weight) or (
+                not self.graph.directed and _improves(tree, destination, origin, weight))
+        elif event == "remove_edge":
+            origin, destination = arguments
+            affected = lambda tree: tree.predecessors.get(destination) == origin or (
+                not self.graph.directed and tree.predecessors.get(origin) == destination)
+        elif event == "remove_node":
+            node_id, = arguments
+            affected = lambda tree: node_id in tree.distances
+        else:
+            return
+        for source in [source for source, tree in self._trees.items() if affected(tree)]:
+            del self._trees[source]
+            self.evictions += 1
+
+    def __repr__(self):
+        return f"ShortestPathCache(hits={self.hits}, misses={self.misses}, size={len(self._trees)}/{self.maxsize})"
+
+def _improves(tree, origin, destination, weight):
+    # Whether an origin -> destination edge shortens (or creates) the path to destination:
+    distance = tree.distances.get(origin)
+    return distance is not None and distance + weight < tree.distances.get(destination, float('inf'))
@@ -6,28 +6,114 @@ It starts from a given node and grows the MST by adding the smallest edge that c
 a node inside the MST to a node outside it.
 
 Parameters:
-- graph: A weighted Graph object.
+- graph: A weighted Graph object, or a CSRGraph from Graph.freeze().
 - start_node: The node from which to start building the MST.
+- dense: If True, use the O(V^2) array-based version, which avoids the heap and is faster
+  on dense graphs such as fully connected layers (for a Graph or a CSRGraph).
 
 Returns:
-- A list of edges that form the MST.
+- A list of (origin, destination, weight) edges that form the MST.
+
+Disconnected graphs:
+- minimum_spanning_forest(graph, dense=False) grows one tree from every node not reached yet
+  and returns the edges of all the trees.
 """
 
 import heapq
+from graph import CSRGraph
+
+def prim(graph, start, dense=False):
+    return _spanning_trees(graph, [start], dense)
+
+def minimum_spanning_forest(graph, dense=False):
+    return _spanning_trees(graph, list(graph.nodes), dense)
 
-def prim(graph, start):
+def _spanning_trees(graph, roots, dense):
+    # Grow a tree from every root that isn't already part of a previous tree:
+    if dense:
+        return _prim_dense(graph, roots)
+    if isinstance(graph, CSRGraph):
+        return _prim_csr(graph, roots)
     visited = set()
-    min_heap = [(0, start)]  # (weight, node)
+    best = {} # Lightest known edge weight into each node outside the trees
     mst = []
-    while min_heap:
-        weight, current_node = heapq.heappop(min_heap)
-        if current_node not in visited:
+    tie_breaker = 0
+    for root in roots:
+        if root in visited:
+            continue
+        min_heap = [(0, tie_breaker, root, None)]  # (weight, tie, node, parent)
+        while min_heap:
+            weight, _, current_node, parent = heapq.heappop(min_heap)
+            if current_node in visited:
+                continue
             visited.add(current_node)
-            if weight > 0:  # Ignore the initial 0-weight edge
-                mst.append((prev_node, current_node, weight))  # Store edge
-            neighbors = graph.get_neighbors(current_node)
-            for neighbor, edge_weight in neighbors:
-                if neighbor not in visited:
-                    heapq.heappush(min_heap, (edge_weight, neighbor))
-                    prev_node = current_node  # Keep track of the previous node
+            if parent is not None:
+                mst.append((parent, current_node, weight))  # Store edge
+            for neighbor, edge_weight in graph.get_neighbors(current_node):
+                # Only push an entry when it improves the best edge into the neighbor:
+                if neighbor not in visited and edge_weight < best.get(neighbor, float('inf')):
+                    best[neighbor] = edge_weight
+                    tie_breaker += 1
+                    heapq.heappush(min_heap, (edge_weight, tie_breaker, neighbor, current_node))
+    return mst
+
+def _prim_dense(graph, roots):
+    # O(V^2) version: keep the lightest edge into every node in flat lists and scan them
+    # for the minimum, instead of maintaining a heap. Frozen graphs are read from their arrays:
+    if isinstance(graph, CSRGraph):
+        node_ids, index = graph.node_ids, graph.index
+        indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+        neighbors = lambda current: ((indices[p], weights[p]) for p in range(indptr[current], indptr[current + 1]))
+    else:
+        node_ids = list(graph.nodes)
+        index = {node: i for i, node in enumerate(node_ids)}
+        neighbors = lambda current: ((index[neighbor], weight) for neighbor, weight in graph.get_neighbors(node_ids[current]))
+    keys = [float('inf')] * len(node_ids)
+    parents = [-1] * len(node_ids)
+    in_tree = bytearray(len(node_ids))
+    mst = []
+    for root in roots:
+        current = index[root]
+        if in_tree[current]:
+            continue
+        keys[current] = 0
+        while current != -1:
+            in_tree[current] = 1
+            if parents[current] != -1:
+                mst.append((node_ids[parents[current]], node_ids[current], keys[current]))
+            for i, edge_weight in neighbors(current):
+                if not in_tree[i] and edge_weight < keys[i]:
+                    keys[i] = edge_weight
+                    parents[i] = current
+            current = -1
+            lightest = float('inf')
+            for i in range(len(node_ids)):
+                if not in_tree[i] and keys[i] < lightest:
+                    lightest = keys[i]
+                    current = i
+    return mst
+
+def _prim_csr(graph, roots):
+    # Same growth over a frozen graph, each heap entry carries the node that reached it:
+    indptr, indices, weights, node_ids = graph.indptr, graph.indices, graph.weights, graph.node_ids
+    in_tree = bytearray(len(node_ids))
+    best = [float('inf')] * len(node_ids)
+    mst = []
+    for root in roots:
+        source = graph.index[root]
+        if in_tree[source]:
+            continue
+        min_heap = [(0, source, -1)]  # (weight, node, parent)
+        while min_heap:
+            weight, current_node, parent = heapq.heappop(min_heap)
+            if in_tree[current_node]:
+                continue
+            in_tree[current_node] = 1
+            if parent != -1:
+                mst.append((node_ids[parent], node_ids[current_node], weight))
+            for p in range(indptr[current_node], indptr[current_node + 1]):
+                neighbor = indices[p]
+                if not in_tree[neighbor] and weights[p] < best[neighbor]:
+                    best[neighbor] = weights[p]
+                    heapq.heappush(min_heap, (weights[p], neighbor, current_node))
     return mst
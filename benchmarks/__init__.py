@@ -0,0 +1,2 @@
+from .generators import GENERATORS, barabasi_albert_graph, erdos_renyi_graph, grid_graph, layered_dag
+from .suite import BENCHMARKS, SIZES, compare, run_benchmarks
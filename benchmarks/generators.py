@@ -0,0 +1,80 @@
+"""
+Graph Generators
+
+Seeded synthetic graphs for the benchmarks, the same seed always gives the same graph. Every
+generator takes a target number of nodes and returns (nodes, edges), where nodes are integers
+and edges are (origin, destination, weight) tuples, so building the Graph can be timed too.
+
+- grid_graph(num_nodes, seed): Road-like grid with random segment lengths. The grid wraps
+  around like ring roads, so every node has degree 4 and the graph has an Eulerian cycle.
+- erdos_renyi_graph(num_nodes, seed, average_degree=8): Uniformly random edges between distinct nodes.
+- barabasi_albert_graph(num_nodes, seed, attachments=3): Power-law graph, each new node is
+  linked to existing nodes chosen proportionally to their degree, which creates a few hubs.
+- layered_dag(num_nodes, seed, width=16): Directed acyclic graph of fully connected layers, like
+  examples/neural_network.py.
+
+GENERATORS maps the name of every generator to (function, directed).
+"""
+
+import math
+import random
+
+def grid_graph(num_nodes, seed=0):
+    rng = random.Random(seed)
+    side = max(3, math.isqrt(num_nodes))
+    nodes = list(range(side * side))
+    edges = []
+    for row in range(side):
+        for column in range(side):
+            node = row * side + column
+            # Link every intersection to the next one on its row and on its column:
+            edges.append((node, row * side + (column + 1) % side, round(rng.uniform(1, 10), 2)))
+            edges.append((node, (row + 1) % side * side + column, round(rng.uniform(1, 10), 2)))
+    return nodes, edges
+
+def erdos_renyi_graph(num_nodes, seed=0, average_degree=8):
+    rng = random.Random(seed)
+    nodes = list(range(num_nodes))
+    num_edges = min(num_nodes * average_degree // 2, num_nodes * (num_nodes - 1) // 2)
+    pairs = set()
+    while len(pairs) < num_edges:
+        origin, destination = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        if origin != destination:
+            pairs.add((min(origin, destination), max(origin, destination)))
+    edges = [(origin, destination, round(rng.uniform(1, 10), 2)) for origin, destination in sorted(pairs)]
+    return nodes, edges
+
+def barabasi_albert_graph(num_nodes, seed=0, attachments=3):
+    rng = random.Random(seed)
+    nodes = list(range(max(num_nodes, attachments + 1)))
+    edges = []
+    targets = list(range(attachments))
+    repeated = [] # Every node once per edge, so sampling it follows the degrees
+    for node in nodes[attachments:]:
+        for target in targets:
+            edges.append((node, target, round(rng.uniform(1, 10), 2)))
+        repeated.extend(targets)
+        repeated.extend([node] * attachments)
+        targets = set()
+        while len(targets) < attachments:
+            targets.add(rng.choice(repeated))
+        targets = sorted(targets)
+    return nodes, edges
+
+def layered_dag(num_nodes, seed=0, width=16):
+    rng = random.Random(seed)
+    num_layers = max(2, num_nodes // width)
+    nodes = list(range(num_layers * width))
+    edges = []
+    for layer in range(num_layers - 1):
+        for origin in range(layer * width, (layer + 1) * width):
+            for destination in range((layer + 1) * width, (layer + 2) * width):
+                edges.append((origin, destination, round(rng.uniform(0.1, 1.0), 1)))
+    return nodes, edges
+
+GENERATORS = {
+    "grid": (grid_graph, False),
+    "erdos_renyi": (erdos_renyi_graph, False),
+    "barabasi_albert": (barabasi_albert_graph, False),
+    "layered_dag": (layered_dag, True),
+}
@@ -0,0 +1,165 @@
+"""
+Benchmark Suite
+
+Times Graph construction and the algorithms on the seeded graphs of benchmarks.generators at
+several sizes, and records the peak memory of every run. Each benchmark is repeated and the best
+and median times are kept; the peak memory is measured in a separate run with tracemalloc, so
+tracing doesn't slow down the timed runs. Results are written as JSON and can be compared against
+a saved baseline, where every benchmark that got slower (or used more memory) by more than the
+threshold is flagged as a regression.
+
+Usage:
+- python -m benchmarks --sizes small medium --output results.json
+- python -m benchmarks --baseline baseline.json --threshold 0.25
+  Exits with status 1 when there are regressions, so it can gate an upgrade.
+- run_benchmarks(graphs, sizes, repeat) returns the results dictionary, and
+  compare(results, baseline, threshold) returns the rows of the comparison.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from algorithms import bfs, boruvka, dfs, dijkstra, hierholzer, kruskal, prim
+from graph import Graph
+from .generators import GENERATORS
+
+SIZES = {"small": 1_000, "medium": 10_000, "large": 100_000} # Target number of nodes
+
+def _build(nodes, edges, directed):
+    graph = Graph(directed=directed, weighted=True)
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(edges)
+    return graph
+
+def _has_eulerian_cycle(graph, source):
+    graph._components.clear() # Time the connectivity check, not the cached labels
+    return graph.has_eulerian_cycle()
+
+def _has_eulerian_path(graph, source):
+    graph._components.clear()
+    return graph.has_eulerian_path()
+
+def _hierholzer(graph, source):
+    graph._components.clear()
+    return hierholzer(graph)
+
+# name -> (function(graph, source), undirected graphs only):
+BENCHMARKS = {
+    "bfs": (bfs, False),
+    "dfs": (dfs, False),
+    "dijkstra": (dijkstra, False),
+    "kruskal": (lambda graph, source: kruskal(graph), True),
+    "boruvka": (lambda graph, source: boruvka(graph), True),
+    "prim": (prim, True),
+    "hierholzer": (_hierholzer, False),
+    "has_eulerian_cycle": (_has_eulerian_cycle, False),
+    "has_eulerian_path": (_has_eulerian_path, False),
+}
+
+def measure(function, repeat=3):
+    # Best and median time of repeat runs, then the peak memory of one traced run:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"best": min(times), "median": statistics.median(times), "peak_memory": peak}
+
+def run_benchmarks(graphs=None, sizes=("small", "medium"), repeat=3, benchmarks=None, seed=0, log=None):
+    results = {}
+    for graph_name in graphs or GENERATORS:
+        generator, directed = GENERATORS[graph_name]
+        for size in sizes:
+            nodes, edges = generator(SIZES[size], seed)
+            cases = {"construction": lambda: _build(nodes, edges, directed)}
+            graph = _build(nodes, edges, directed)
+            source = nodes[0]
+            for name, (function, undirected_only) in BENCHMARKS.items():
+                if not (undirected_only and directed):
+                    cases[name] = lambda function=function: function(graph, source)
+            for name, case in cases.items():
+                if benchmarks is not None and name not in benchmarks:
+                    continue
+                key = f"{graph_name}/{size}/{name}"
+                results[key] = {
+                    "graph": graph_name, "size": size, "nodes": len(nodes), "edges": len(edges),
+                    "benchmark": name, **measure(case, repeat),
+                }
+                if log is not None:
+                    log(f"{key}: {results[key]['best']:.4f}s, {results[key]['peak_memory'] / 2**20:.1f} MiB")
+    return {
+        "metadata": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(results, baseline, threshold=0.25, min_time=0.01, min_memory=2**20):
+    # One row per benchmark found in both runs: (key, baseline time, time, time ratio,
+    # memory ratio, status), where status is "regression", "faster" or "unchanged".
+    # Runs faster than min_time, or using less than min_memory bytes, are too noisy to flag:
+    rows = []
+    for key, current in results["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        time_ratio = current["best"] / previous["best"] if previous["best"] else 1.0
+        memory_ratio = current["peak_memory"] / previous["peak_memory"] if previous["peak_memory"] else 1.0
+        timed = max(current["best"], previous["best"]) >= min_time
+        sized = max(current["peak_memory"], previous["peak_memory"]) >= min_memory
+        if (timed and time_ratio > 1 + threshold) or (sized and memory_ratio > 1 + threshold):
+            status = "regression"
+        elif timed and time_ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "unchanged"
+        rows.append((key, previous["best"], current["best"], time_ratio, memory_ratio, status))
+    return rows
+
+def save(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark graph construction and algorithms.")
+    parser.add_argument("--graphs", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--benchmarks", nargs="+", choices=["construction", *BENCHMARKS])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown flagged as a regression")
+    arguments = parser.parse_args(arguments)
+    results = run_benchmarks(arguments.graphs, arguments.sizes, arguments.repeat, arguments.benchmarks,
+                             arguments.seed, log=print)
+    if arguments.output:
+        save(results, arguments.output)
+    if not arguments.baseline:
+        return 0
+    rows = compare(results, load(arguments.baseline), arguments.threshold)
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'time':>7} {'memory':>7}")
+    for key, previous, current, time_ratio, memory_ratio, status in rows:
+        flag = "" if status == "unchanged" else f"  {status.upper()}"
+        print(f"{key:<40} {previous:>9.4f}s {current:>9.4f}s {time_ratio:>6.2f}x {memory_ratio:>6.2f}x{flag}")
+    regressions = sum(status == "regression" for *_, status in rows)
+    print(f"\n{regressions} regression(s) past {arguments.threshold:.0%}.")
+    return 1 if regressions else 0
@@ -0,0 +1,341 @@
+"""
+Concurrent Graph
+
+A graph for services where many threads run queries while a writer applies updates. Readers
+never lock: they call snapshot() and get an immutable GraphSnapshot, which provides the same
+read methods as Graph (nodes, get_neighbors, get_predecessors, degrees, edges, freeze...) and can
+be passed to any algorithm. Writers are serialized by a lock and build the next version
+copy-on-write: the node and adjacency maps are split into buckets shared between versions, so
+an update only copies the buckets and the adjacency tuples of the nodes it touches, which costs
+O(degree + sqrt(V)) instead of O(V). The new snapshot is published with a single attribute
+assignment, so a query sees either all or none of an update.
+
+Usage:
+- graph = ConcurrentGraph(directed=False, weighted=False)
+- graph.add_node, add_nodes_from, add_edge, add_edges_from, remove_edge, remove_node and
+  remove_nodes_from publish one new version each.
+- Inside "with graph.batch():" all the updates are published together as one version when the
+  block exits, or discarded if it raises. Batching also avoids copying the same buckets per update.
+- graph.snapshot() returns the latest published GraphSnapshot, and graph.version its number.
+"""
+
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from graph import Edge, EdgeView, Graph, Node, _eulerian_path_start, _has_eulerian_cycle
+from utils.errors import NodeNotFoundError
+
+class GraphSnapshot:
+    # Immutable version of a ConcurrentGraph: node -> tuple of (neighbor, weight) adjacency,
+    # undirected graphs store both directions and are their own reverse
+
+    def __init__(self, directed, weighted, version, nodes, successors, predecessors):
+        self.directed = directed
+        self.weighted = weighted
+        self.version = version
+        self.nodes = nodes
+        self._successors = successors
+        self._predecessors = predecessors
+        self.edges = EdgeView(self)
+        self.reverse_edges = EdgeView(self, incoming=True)
+        self._components = {} # Component labels cached by algorithms.components
+
+    def get_neighbors(self, node_id):
+        return list(self._successors.get(node_id, ()))
+
+    def get_predecessors(self, node_id):
+        return list(self._predecessors.get(node_id, ()))
+
+    def get_edges(self, node_id):
+        return [Edge(node_id, destination, weight) for destination, weight in self._successors.get(node_id, ())]
+
+    def get_incoming_edges(self, node_id):
+        return [Edge(origin, node_id, weight) for origin, weight in self._predecessors.get(node_id, ())]
+
+    def degree(self, node_id):
+        if not self.directed:
+            return self.out_degree(node_id)
+        return self.in_degree(node_id) + self.out_degree(node_id)
+
+    def in_degree(self, node_id):
+        return len(self._predecessors.get(node_id, ()))
+
+    def out_degree(self, node_id):
+        return len(self._successors.get(node_id, ()))
+
+    def has_eulerian_cycle(self):
+        return _has_eulerian_cycle(self)
+
+    def has_eulerian_path(self):
+        return self.eulerian_path_start() is not None
+
+    def eulerian_path_start(self):
+        return _eulerian_path_start(self)
+
+    freeze = Graph.freeze # Only needs nodes and get_neighbors
+
+    def __repr__(self):
+        return f"GraphSnapshot(version={self.version}, directed={self.directed}, weighted={self.weighted}, nodes={len(self.nodes)})"
+
+
+class ConcurrentGraph:
+
+    def __init__(self, directed=False, weighted=False):
+        self.directed = directed
+        self.weighted = weighted
+        successors = _SharedMap()
+        self._snapshot = GraphSnapshot(directed, weighted, 0, _SharedMap(), successors, _SharedMap() if directed else successors)
+        self._lock = threading.RLock() # Serializes the writers
+        self._draft = None
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        return self._snapshot
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            if self._draft is not None:
+                yield self # Nested batches are part of the outer one
+                return
+            self._draft = _Draft(self._snapshot)
+            try:
+                yield self
+                snapshot = self._draft.publish(self._snapshot.version + 1)
+            finally:
+                self._draft = None
+            self._snapshot = snapshot # Atomic publish
+
+    def add_node(self, node_id, data=None):
+        with self.batch():
+            self._draft.add_node(node_id, data)
+
+    def add_nodes_from(self, node_ids, data=None):
+        with self.batch():
+            for node_id in node_ids:
+                self._draft.add_node(node_id, data.get(node_id) if data else None)
+
+    def add_edge(self, origin, destination, weight=1):
+        with self.batch():
+            self._draft.add_edge(origin, destination, weight if self.weighted else 1)
+
+    def add_edges_from(self, edges):
+        with self.batch():
+            for edge in edges:
+                self._draft.add_edge(edge[0], edge[1], edge[2] if self.weighted and len(edge) > 2 else 1)
+
+    def remove_edge(self, origin, destination):
+        with self.batch():
+            self._draft.remove_edge(origin, destination)
+
+    def remove_node(self, node_id):
+        with self.batch():
+            self._draft.remove_node(node_id)
+
+    def remove_nodes_from(self, node_ids):
+        with self.batch():
+            for node_id in node_ids:
+                self._draft.remove_node(node_id)
+
+    def __repr__(self):
+        return f"ConcurrentGraph(version={self.version}, directed={self.directed}, weighted={self.weighted}, nodes={len(self._snapshot.nodes)})"
+
+
+class _Draft:
+    # Next version being written: drafts of the snapshot maps, where the adjacency of a node
+    # becomes a list the first time it is touched
+
+    def __init__(self, snapshot):
+        self.directed = snapshot.directed
+        self.weighted = snapshot.weighted
+        self.nodes = snapshot.nodes.draft()
+        self.successors = snapshot._successors.draft()
+        self.predecessors = snapshot._predecessors.draft() if self.directed else self.successors
+        self.touched = set()
+
+    def publish(self, version):
+        # Freeze the touched adjacency lists back into tuples:
+        for index in (self.successors, self.predecessors) if self.directed else (self.successors,):
+            for node_id in self.touched:
+                neighbors = index.get(node_id)
+                if neighbors is not None:
+                    if neighbors:
+                        index[node_id] = tuple(neighbors)
+                    else:
+                        del index[node_id]
+        successors = self.successors.publish()
+        predecessors = self.predecessors.publish() if self.directed else successors
+        return GraphSnapshot(self.directed, self.weighted, version, self.nodes.publish(), successors, predecessors)
+
+    def _adjacency(self, index, node_id):
+        # Copy on first write, the tuples of published snapshots are never modified:
+        neighbors = index.get(node_id)
+        if not isinstance(neighbors, list):
+            neighbors = index[node_id] = list(neighbors or ())
+            self.touched.add(node_id)
+        return neighbors
+
+    def add_node(self, node_id, data):
+        if node_id not in self.nodes:
+            self.nodes[node_id] = Node(node_id, data)
+
+    def add_edge(self, origin, destination, weight):
+        if origin not in self.nodes or destination not in self.nodes:
+            raise NodeNotFoundError("Both nodes must exist in the graph.")
+        self._adjacency(self.successors, origin).append((destination, weight))
+        self._adjacency(self.predecessors, destination).append((origin, weight))
+
+    def remove_edge(self, origin, destination):
+        self._filter(self.successors, origin, destination)
+        self._filter(self.predecessors, destination, origin)
+
+    def remove_node(self, node_id):
+        if node_id not in self.nodes:
+            return
+        for neighbor, _ in self.successors.get(node_id, ()):
+            self._filter(self.predecessors, neighbor, node_id)
+        for neighbor, _ in self.predecessors.get(node_id, ()):
+            self._filter(self.successors, neighbor, node_id)
+        del self.nodes[node_id]
+        self.successors.pop(node_id, None)
+        self.predecessors.pop(node_id, None)
+
+    def _filter(self, index, node_id, neighbor):
+        if any(other == neighbor for other, _ in index.get(node_id, ())):
+            adjacency = self._adjacency(index, node_id)
+            adjacency[:] = [entry for entry in adjacency if entry[0] != neighbor]
+
+
+_HOLE = object() # Position of a removed key
+
+class _SharedMap(Mapping):
+    # Immutable mapping that shares its storage with the other versions. The entries are spread
+    # over buckets by key hash, as key -> (value, position), and the insertion order is kept in
+    # chunks of keys, where removed keys leave a hole. A draft copies only the buckets and chunks
+    # it changes. The number of buckets grows with the square root of the size, so copying one
+    # bucket or the list of buckets stays cheap.
+    CHUNK = 256
+
+    def __init__(self, buckets=None, chunks=None, length=0, holes=0):
+        self._buckets = buckets or [{} for _ in range(16)]
+        self._chunks = chunks or []
+        self._length = length
+        self._holes = holes
+
+    def __getitem__(self, key):
+        return self._buckets[hash(key) & (len(self._buckets) - 1)][key][0]
+
+    def get(self, key, default=None):
+        entry = self._buckets[hash(key) & (len(self._buckets) - 1)].get(key)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, key):
+        return key in self._buckets[hash(key) & (len(self._buckets) - 1)]
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self._holes:
+                yield from (key for key in chunk if key is not _HOLE)
+            else:
+                yield from chunk
+
+    def __len__(self):
+        return self._length
+
+    def draft(self):
+        return _MapDraft(self)
+
+    @classmethod
+    def _build(cls, items, num_buckets):
+        buckets = [{} for _ in range(num_buckets)]
+        chunks = []
+        for position, (key, value) in enumerate(items):
+            if position % cls.CHUNK == 0:
+                chunks.append([])
+            chunks[-1].append(key)
+            buckets[hash(key) & (num_buckets - 1)][key] = (value, position)
+        return cls(buckets, chunks, len(items))
+
+
+class _MapDraft:
+    # Next version of a _SharedMap: the lists of buckets and chunks are copied, the buckets and
+    # chunks themselves only the first time they are written
+
+    def __init__(self, base):
+        self._buckets = list(base._buckets)
+        self._chunks = list(base._chunks)
+        self._length = base._length
+        self._holes = base._holes
+        self._own_buckets = set()
+        self._own_chunks = set()
+
+    def _bucket(self, key, write=False):
+        i = hash(key) & (len(self._buckets) - 1)
+        if write and i not in self._own_buckets:
+            self._buckets[i] = dict(self._buckets[i])
+            self._own_buckets.add(i)
+        return self._buckets[i]
+
+    def _chunk(self, i):
+        if i not in self._own_chunks:
+            self._chunks[i] = list(self._chunks[i])
+            self._own_chunks.add(i)
+        return self._chunks[i]
+
+    def __getitem__(self, key):
+        return self._bucket(key)[key][0]
+
+    def get(self, key, default=None):
+        entry = self._bucket(key).get(key)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, key):
+        return key in self._bucket(key)
+
+    def __setitem__(self, key, value):
+        bucket = self._bucket(key, write=True)
+        entry = bucket.get(key)
+        if entry is not None:
+            bucket[key] = (value, entry[1])
+            return
+        # New keys go after every position used so far:
+        position = self._length + self._holes
+        chunk, offset = divmod(position, _SharedMap.CHUNK)
+        if chunk == len(self._chunks):
+            self._chunks.append([])
+            self._own_chunks.add(chunk)
+        self._chunk(chunk).append(key)
+        bucket[key] = (value, position)
+        self._length += 1
+
+    def __delitem__(self, key):
+        _, position = self._bucket(key, write=True).pop(key)
+        chunk, offset = divmod(position, _SharedMap.CHUNK)
+        self._chunk(chunk)[offset] = _HOLE
+        self._length -= 1
+        self._holes += 1
+
+    def pop(self, key, default=None):
+        entry = self._bucket(key).get(key)
+        if entry is None:
+            return default
+        del self[key]
+        return entry[0]
+
+    def items(self):
+        for chunk in self._chunks:
+            for key in chunk:
+                if key is not _HOLE:
+                    yield key, self[key]
+
+    def publish(self):
+        num_buckets = len(self._buckets)
+        if self._length > num_buckets * num_buckets or self._holes > max(self._length, _SharedMap.CHUNK):
+            # Rebuild with more buckets, or without holes, which is amortized over the updates:
+            while self._length > num_buckets * num_buckets:
+                num_buckets *= 2
+            return _SharedMap._build(list(self.items()), num_buckets)
+        return _SharedMap(self._buckets, self._chunks, self._length, self._holes)
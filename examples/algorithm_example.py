@@ -9,8 +9,7 @@ def run():
 
     # List of nodes to add
     nodes = ["A", "B", "C", "D", "E", "F"]
-    for node in nodes:
-        graph.add_node(node)
+    graph.add_nodes_from(nodes)
 
     # List of edges with weights to add
     edges_with_weights = [
@@ -24,8 +23,7 @@ def run():
         ("D", "F", 8),
         ("E", "F", 9),
     ]
-    for origin, destination, weight in edges_with_weights:
-        graph.add_edge(origin, destination, weight=weight)
+    graph.add_edges_from(edges_with_weights)
 
     # Run and print the results of BFS
     print("BFS Traversal starting from node 'A':")
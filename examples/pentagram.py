@@ -9,8 +9,7 @@ def run():
 
     # Define nodes:
     nodes = ['A', 'B', 'C', 'D', 'E']
-    for node in nodes:
-        graph.add_node(node)
+    graph.add_nodes_from(nodes)
 
     # Define edges in a pentagram form:
     edges = [
@@ -20,8 +19,7 @@ def run():
         ('B', 'D'),
         ('D', 'A')
     ]
-    for origin, destination in edges:
-        graph.add_edge(origin, destination)
+    graph.add_edges_from(edges)
 
     # Calculate positions in a circular layout for the pentagon shape:
     pos = {}
@@ -1,8 +1,28 @@
-from collections import defaultdict
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from mmap import ACCESS_READ, mmap as memory_map
+from numbers import Integral
+from operator import itemgetter
+import gc
+import json
+import struct
+import sys
+import numpy as np
 from utils.errors import NodeNotFoundError, EdgeNotFoundError
 
+# Binary format written by save() and read by load(): a header, the node ids (an int64 array
+# when they are all integers, a JSON array otherwise), the optional node data (a JSON array of
+# [node index, data] pairs), then the CSR indptr, indices and weights arrays. Every section is
+# aligned to 8 bytes and the arrays hold 8-byte values. Nothing in the file is executed on load:
+FORMAT_MAGIC = b"GRAPHCSR"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQ") # magic, version, flags, nodes, edges, node id size, node data size
+DIRECTED, WEIGHTED, FLOAT_WEIGHTS, BIG_ENDIAN, INTEGER_IDS = 1, 2, 4, 8, 16
+
 class Node:
-    
+    __slots__ = ("id", "data")
+
     def __init__(self, id, data=None):
         self.id = id
         self.data = data
@@ -20,7 +40,8 @@ class Node:
 
 
 class Edge:
-    
+    __slots__ = ("origin", "destination", "weight")
+
     def __init__(self, origin, destination, weight=1):
         self.origin = origin
         self.destination = destination
@@ -40,116 +61,445 @@ class Edge:
 
 class Graph:
     
-    def __init__(self, directed=False, weighted=False):
+    def __init__(self, directed=False, weighted=False, compact=False):
         self.directed = directed
         self.weighted = weighted
+        self.compact = compact
         self.nodes = {}
-        self.edges = defaultdict(list)
+        if compact:
+            # Edge-less storage: node -> (neighbor ids, weights) as parallel arrays.
+            # Edge objects are only built when edges or reverse_edges are read:
+            self._adjacency = {}
+            # An undirected graph stores both directions, so it is its own reverse:
+            self._reverse_adjacency = {} if directed else self._adjacency
+            # Weights are int64 until the first other weight switches every array to float64:
+            self._weight_typecode = "q"
+        else:
+            # Adjacency keyed by destination: node -> {neighbor: [Edge, ...]}, with parallel
+            # edges sharing a list, so the edges between two nodes are unlinked in O(1).
+            # An undirected graph only keeps the outgoing index, its reverse is the same:
+            self._successors = {}
+            self._predecessors = {} if directed else self._successors
+        self.edges = EdgeView(self)
+        self.reverse_edges = EdgeView(self, incoming=True) # Incoming edges of each node
+        self._in_degrees = {}
+        self._out_degrees = {}
+        # Incremented by every mutation, listeners get each mutation as (event, *arguments):
+        self.version = 0
+        self._listeners = []
+        self._components = {} # Component labels cached by algorithms.components
+
+    def subscribe(self, listener):
+        # Call listener(event, *arguments) after each mutation, where the events are
+        # ("add_node", node_id), ("add_edge", origin, destination, weight),
+        # ("remove_edge", origin, destination), ("remove_node", node_id) and
+        # ("set_weight", origin, destination, old_weight, new_weight):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _changed(self, event, *arguments):
+        self.version += 1
+        for listener in self._listeners:
+            listener(event, *arguments)
 
     def add_node(self, node_id, data=None):
         if node_id not in self.nodes:
             self.nodes[node_id] = Node(node_id, data)
+            self._in_degrees[node_id] = 0
+            self._out_degrees[node_id] = 0
+            self._changed("add_node", node_id)
 
     def add_edge(self, origin, destination, weight=1):
         if origin not in self.nodes or destination not in self.nodes:
             raise NodeNotFoundError("Both nodes must exist in the graph.")
         if not self.weighted:
             weight = 1
-        edge = Edge(origin, destination, weight)
-        self.edges[origin].append(edge)
+        if self.compact:
+            self._link_compact(origin, destination, weight)
+            if not self.directed:
+                self._link_compact(destination, origin, weight)
+        else:
+            self._link(Edge(origin, destination, weight))
+            if not self.directed:
+                self._link(Edge(destination, origin, weight))
+        self._changed("add_edge", origin, destination, weight)
+
+    def add_nodes_from(self, node_ids, data=None):
+        # Add many nodes at once, data is an optional dictionary of node -> data:
+        nodes, in_degrees, out_degrees = self.nodes, self._in_degrees, self._out_degrees
+        get_data = data.get if data else (lambda node_id: None)
+        for node_id in node_ids:
+            if node_id not in nodes:
+                nodes[node_id] = Node(node_id, get_data(node_id))
+                in_degrees[node_id] = 0
+                out_degrees[node_id] = 0
+                self._changed("add_node", node_id)
+
+    def add_edges_from(self, edges):
+        # Add many (origin, destination) or (origin, destination, weight) edges at once.
+        # The whole batch is validated first, so a bad edge leaves the graph untouched:
+        edges = edges if isinstance(edges, list) else list(edges)
+        origins = list(map(itemgetter(0), edges))
+        destinations = list(map(itemgetter(1), edges))
+        if self.weighted:
+            weights = [edge[2] if len(edge) > 2 else 1 for edge in edges]
+        else:
+            weights = [1] * len(edges)
+        # Number the nodes of the batch, so edges and counters can be grouped per node with NumPy:
+        codes = dict.fromkeys(origins)
+        codes.update(dict.fromkeys(destinations))
+        missing = codes.keys() - self.nodes.keys()
+        if missing:
+            raise NodeNotFoundError(next(iter(missing)))
+        nodes = list(codes)
+        codes = dict(zip(nodes, range(len(nodes))))
+        origin_codes = np.fromiter(map(codes.__getitem__, origins), dtype=np.int64, count=len(origins))
+        destination_codes = np.fromiter(map(codes.__getitem__, destinations), dtype=np.int64, count=len(destinations))
+        if self.compact:
+            self._link_compact_batch(origins, destinations, weights)
+        else:
+            self._link_batch(nodes, origin_codes, destination_codes, origins, destinations, weights)
+        # Update the degree counters once per node instead of once per edge:
+        out_counts = np.bincount(origin_codes, minlength=len(nodes))
+        in_counts = np.bincount(destination_codes, minlength=len(nodes))
         if not self.directed:
-            self.edges[destination].append(Edge(destination, origin, weight))
+            out_counts = in_counts = out_counts + in_counts
+        for counters, counts in ((self._out_degrees, out_counts), (self._in_degrees, in_counts)):
+            for node, count in zip(nodes, counts.tolist()):
+                counters[node] += count
+        if self._listeners:
+            for edge in zip(origins, destinations, weights):
+                self._changed("add_edge", *edge)
+        else:
+            self.version += len(origins)
+
+    @classmethod
+    def from_edge_array(cls, src, dst, weight=None, directed=False, weighted=None, compact=False):
+        # Build a graph from parallel arrays (NumPy arrays or sequences) of edge origins,
+        # destinations and optional weights. Nodes are added in sorted order:
+        src, dst = np.asarray(src), np.asarray(dst)
+        if src.ndim != 1 or src.shape != dst.shape:
+            raise ValueError("src and dst must be one-dimensional arrays of the same length.")
+        if weighted is None:
+            weighted = weight is not None
+        if weight is None or not weighted:
+            weight = np.ones(len(src), dtype=np.int64)
+        weight = np.asarray(weight)
+        if weight.shape != src.shape:
+            raise ValueError("weight must have the same length as src and dst.")
+        graph = cls(directed=directed, weighted=weighted, compact=compact)
+        node_ids, codes = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        node_list = node_ids.tolist()
+        graph.add_nodes_from(node_list)
+        num_nodes = len(node_list)
+        origins, destinations = codes[:len(src)], codes[len(src):]
+        out_counts = np.bincount(origins, minlength=num_nodes)
+        in_counts = np.bincount(destinations, minlength=num_nodes)
+        if not directed:
+            out_counts = in_counts = out_counts + in_counts
+        graph._out_degrees = dict(zip(node_list, out_counts.tolist()))
+        graph._in_degrees = dict(zip(node_list, in_counts.tolist()))
+        graph.version += len(src)
+        if not compact:
+            graph._link_batch(node_list, origins, destinations, src.tolist(), dst.tolist(), weight.tolist())
+            return graph
+        # Compact graphs are grouped per node with a stable sort, so every node gets its
+        # arrays in one slice while keeping the edge order of add_edge:
+        if weight.dtype.kind in "biu":
+            weight = weight.astype(np.int64)
+        else:
+            weight = weight.astype(np.float64)
+            graph._weight_typecode = "d"
+        if not directed:
+            # Interleave both directions of every edge, like add_edge does:
+            origins, destinations = np.stack([origins, destinations], axis=1).ravel(), np.stack([destinations, origins], axis=1).ravel()
+            weight = np.repeat(weight, 2)
+        indexes = [(graph._adjacency, origins, destinations)]
+        if directed:
+            indexes.append((graph._reverse_adjacency, destinations, origins))
+        for adjacency, keys, values in indexes:
+            order = np.argsort(keys, kind="stable")
+            sorted_values = values[order].tolist()
+            sorted_weights = weight[order]
+            boundaries = np.searchsorted(keys[order], np.arange(num_nodes + 1)).tolist()
+            for i in range(num_nodes):
+                start, end = boundaries[i], boundaries[i + 1]
+                if start != end:
+                    weights = array(graph._weight_typecode)
+                    weights.frombytes(sorted_weights[start:end].tobytes())
+                    adjacency[node_list[i]] = ([node_list[j] for j in sorted_values[start:end]], weights)
+        return graph
+
+    def _link(self, edge):
+        # Register an edge in both adjacency indexes and update the degree counters:
+        _insert(self._successors, edge.origin, edge.destination, edge)
+        if self.directed:
+            _insert(self._predecessors, edge.destination, edge.origin, edge)
+        self._out_degrees[edge.origin] += 1
+        self._in_degrees[edge.destination] += 1
+
+    def _link_batch(self, nodes, origin_codes, destination_codes, origins, destinations, weights):
+        # Same as _link for a whole batch, the counters are updated by the caller. nodes[code] is
+        # the node id of every code in the origin_codes and destination_codes arrays. The Edge
+        # objects are created in one pass, then grouped per node with a stable sort, so each
+        # node gets its {neighbor: [Edge, ...]} dictionary from one slice in add_edge order.
+        # The garbage collector is paused, the new containers would trigger useless collections:
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            edges = list(map(Edge, origins, destinations, weights))
+            if self.directed:
+                _insert_batch(self._successors, nodes, origin_codes, destinations, edges)
+                _insert_batch(self._predecessors, nodes, destination_codes, origins, edges)
+                return
+            # Interleave both directions of every edge, like add_edge does:
+            both = [None] * (2 * len(edges))
+            both[0::2] = edges
+            both[1::2] = map(Edge, destinations, origins, weights)
+            neighbors = [None] * len(both)
+            neighbors[0::2] = destinations
+            neighbors[1::2] = origins
+            codes = np.stack([origin_codes, destination_codes], axis=1).ravel()
+            _insert_batch(self._successors, nodes, codes, neighbors, both)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _link_compact(self, origin, destination, weight):
+        self._check_weights((weight,))
+        for adjacency, node, neighbor in self._compact_indexes(origin, destination):
+            if node not in adjacency:
+                adjacency[node] = ([], array(self._weight_typecode))
+            neighbors, weights = adjacency[node]
+            neighbors.append(neighbor)
+            weights.append(weight)
+        self._out_degrees[origin] += 1
+        self._in_degrees[destination] += 1
+
+    def _link_compact_batch(self, origins, destinations, weights):
+        # Same as _link_compact for a whole batch, the counters are updated by the caller:
+        # (an undirected graph is its own reverse, so both directions land in _adjacency):
+        self._check_weights(weights)
+        adjacency, reverse_adjacency, typecode = self._adjacency, self._reverse_adjacency, self._weight_typecode
+        for origin, destination, weight in zip(origins, destinations, weights):
+            entry = adjacency.get(origin)
+            if entry is None:
+                entry = adjacency[origin] = ([], array(typecode))
+            entry[0].append(destination)
+            entry[1].append(weight)
+            entry = reverse_adjacency.get(destination)
+            if entry is None:
+                entry = reverse_adjacency[destination] = ([], array(typecode))
+            entry[0].append(origin)
+            entry[1].append(weight)
+
+    def _check_weights(self, weights):
+        # Keep the int64 arrays while every weight is an integer they can hold, like
+        # CSRGraph does, and switch all of them to float64 on the first other weight:
+        if self._weight_typecode == "q" and not all(map(_is_int64, weights)):
+            self._weight_typecode = "d"
+            indexes = (self._adjacency,) if self._reverse_adjacency is self._adjacency else (self._adjacency, self._reverse_adjacency)
+            for adjacency in indexes:
+                for node, (neighbors, old_weights) in adjacency.items():
+                    adjacency[node] = (neighbors, array("d", old_weights))
+
+    def _unlink(self, origin, destination):
+        # Drop every origin -> destination edge from both adjacency indexes:
+        if self.compact:
+            return self._unlink_compact(origin, destination)
+        removed = _pop(self._successors, origin, destination)
+        if removed:
+            if self.directed:
+                _pop(self._predecessors, destination, origin)
+            self._out_degrees[origin] -= len(removed)
+            self._in_degrees[destination] -= len(removed)
+
+    def _unlink_compact(self, origin, destination):
+        removed = 0
+        for adjacency, node, neighbor in self._compact_indexes(origin, destination):
+            if node not in adjacency:
+                continue
+            neighbors, weights = adjacency[node]
+            kept = [i for i, other in enumerate(neighbors) if other != neighbor]
+            removed = len(neighbors) - len(kept)
+            if removed:
+                adjacency[node] = ([neighbors[i] for i in kept], array(weights.typecode, [weights[i] for i in kept]))
+        self._out_degrees[origin] -= removed
+        self._in_degrees[destination] -= removed
+
+    def _compact_indexes(self, origin, destination):
+        # (arrays, node, neighbor) entries to update for an origin -> destination edge:
+        if self.directed:
+            return ((self._adjacency, origin, destination), (self._reverse_adjacency, destination, origin))
+        return ((self._adjacency, origin, destination),)
 
     def remove_node(self, node_id):
         if node_id in self.nodes:
-            del self.nodes[node_id]
-            self.edges.pop(node_id, None)
-            for origin in list(self.edges.keys()):
-                self.edges[origin] = [edge for edge in self.edges[origin] if edge.destination != node_id]
+            # Only the neighbors of the node have to be visited, thanks to the reverse index:
+            for origin in {origin for origin, _ in self.get_predecessors(node_id)}:
+                self._unlink(origin, node_id)
+            for destination in {destination for destination, _ in self.get_neighbors(node_id)}:
+                self._unlink(node_id, destination)
+            self._forget(node_id)
+            self._changed("remove_node", node_id)
+
+    def remove_nodes_from(self, node_ids):
+        removed = {node_id for node_id in node_ids if node_id in self.nodes}
+        if not self.compact:
+            for node_id in removed:
+                self.remove_node(node_id)
+            return
+        # Compact graphs filter the arrays of every remaining neighbor once for the whole
+        # batch, instead of once per removed node. Each pass is (arrays to filter, index
+        # giving the neighbors to visit, degree counters to update):
+        if self.directed:
+            passes = (
+                (self._adjacency, self._reverse_adjacency, (self._out_degrees,)),
+                (self._reverse_adjacency, self._adjacency, (self._in_degrees,))
+            )
+        else:
+            passes = ((self._adjacency, self._adjacency, (self._out_degrees, self._in_degrees)),)
+        for adjacency, other, counters in passes:
+            touched = {neighbor for node_id in removed for neighbor in other.get(node_id, ((),))[0]}
+            for node in touched - removed:
+                neighbors, weights = adjacency[node]
+                kept = [i for i, neighbor in enumerate(neighbors) if neighbor not in removed]
+                adjacency[node] = ([neighbors[i] for i in kept], array(weights.typecode, [weights[i] for i in kept]))
+                for degrees in counters:
+                    degrees[node] -= len(neighbors) - len(kept)
+        for node_id in removed:
+            self._forget(node_id)
+            self._changed("remove_node", node_id)
+
+    def _forget(self, node_id):
+        # Drop a node whose edges to other nodes are already unlinked:
+        del self.nodes[node_id]
+        del self._in_degrees[node_id]
+        del self._out_degrees[node_id]
+        if self.compact:
+            self._adjacency.pop(node_id, None)
+            self._reverse_adjacency.pop(node_id, None)
+        else:
+            self._successors.pop(node_id, None)
+            self._predecessors.pop(node_id, None)
 
     def remove_edge(self, origin, destination):
-        if origin in self.edges:
-            self.edges[origin] = [edge for edge in self.edges[origin] if edge.destination != destination]
+        self._unlink(origin, destination)
         if not self.directed:
-            if destination in self.edges:
-                self.edges[destination] = [edge for edge in self.edges[destination] if edge.destination != origin]
+            self._unlink(destination, origin)
+        self._changed("remove_edge", origin, destination)
+
+    def set_weight(self, origin, destination, weight):
+        # Change the weight of the origin -> destination edges in place (both directions
+        # of an undirected edge). O(1) per edge, O(degree) in compact mode:
+        if not self.has_edge(origin, destination):
+            raise EdgeNotFoundError(origin, destination)
+        if not self.weighted:
+            weight = 1
+        old_weight = self._set_weight(origin, destination, weight)
+        self._changed("set_weight", origin, destination, old_weight, weight)
+
+    def update_weights(self, updates):
+        # Apply many (origin, destination, weight) changes, after checking all the edges exist:
+        updates = list(updates)
+        for origin, destination, _ in updates:
+            if not self.has_edge(origin, destination):
+                raise EdgeNotFoundError(origin, destination)
+        for origin, destination, weight in updates:
+            if not self.weighted:
+                weight = 1
+            old_weight = self._set_weight(origin, destination, weight)
+            self._changed("set_weight", origin, destination, old_weight, weight)
+
+    def has_edge(self, origin, destination):
+        if self.compact:
+            return destination in self._adjacency.get(origin, ((), ()))[0]
+        return destination in self._successors.get(origin, ())
+
+    def _set_weight(self, origin, destination, weight):
+        # Update both stored copies and return the lightest previous weight. For undirected
+        # graphs the reverse index is the outgoing one, so this covers the mirror edges:
+        if self.compact:
+            self._check_weights((weight,))
+            neighbors, weights = self._adjacency[origin]
+            old_weight = min(weights[i] for i, other in enumerate(neighbors) if other == destination)
+            for adjacency, node, neighbor in ((self._adjacency, origin, destination), (self._reverse_adjacency, destination, origin)):
+                neighbors, weights = adjacency[node]
+                for i, other in enumerate(neighbors):
+                    if other == neighbor:
+                        weights[i] = weight
+            return old_weight
+        old_weight = min(edge.weight for edge in self._successors[origin][destination])
+        for index, node, neighbor in ((self._successors, origin, destination), (self._predecessors, destination, origin)):
+            for edge in index[node][neighbor]:
+                edge.weight = weight
+        return old_weight
 
     def get_neighbors(self, node_id):
-        return [(edge.destination, edge.weight) for edge in self.edges[node_id]]
+        if self.compact:
+            return list(zip(*self._adjacency.get(node_id, ((), ()))))
+        return [(edge.destination, edge.weight) for edge in self.get_edges(node_id)]
+
+    def get_predecessors(self, node_id):
+        if self.compact:
+            return list(zip(*self._reverse_adjacency.get(node_id, ((), ()))))
+        return [(edge.origin, edge.weight) for edge in self.get_incoming_edges(node_id)]
+
+    def get_edges(self, node_id):
+        if self.compact:
+            return [Edge(node_id, destination, weight) for destination, weight in self.get_neighbors(node_id)]
+        return [edge for parallel in self._successors.get(node_id, {}).values() for edge in parallel]
+
+    def get_incoming_edges(self, node_id):
+        if self.compact:
+            return [Edge(origin, node_id, weight) for origin, weight in self.get_predecessors(node_id)]
+        if not self.directed:
+            # The incoming edges are the outgoing copies stored at each neighbor:
+            successors = self._successors
+            return [edge for origin in successors.get(node_id, ()) for edge in successors[origin][node_id]]
+        return [edge for parallel in self._predecessors.get(node_id, {}).values() for edge in parallel]
     
     def degree(self, node_id):
         if not self.directed:
-            return len(self.get_neighbors(node_id))
+            return self.out_degree(node_id)
         else:
             return self.in_degree(node_id) + self.out_degree(node_id)
 
     def in_degree(self, node_id):
-        return sum(1 for node in self.nodes if node_id in [neighbor for neighbor, _ in self.get_neighbors(node)])
+        return self._in_degrees.get(node_id, 0)
 
     def out_degree(self, node_id):
-        return len(self.get_neighbors(node_id))
+        return self._out_degrees.get(node_id, 0)
 
     def has_eulerian_cycle(self):
-        def _dfs(start_node, visited):
-            stack = [start_node]
-            while stack:
-                node = stack.pop()
-                if node not in visited:
-                    visited.add(node)
-                    for neighbor, _ in self.get_neighbors(node):
-                        if neighbor not in visited:
-                            stack.append(neighbor)
-        visited = set()
-        start_node = next(iter(self.nodes))
-        if self.directed:
-            # Check in-degrees and out-degrees match for all nodes:
-            if any(self.in_degree(node) != self.out_degree(node) for node in self.nodes):
-                return False
-        else:
-            # Check all nodes have even degrees:
-            if any(len(self.get_neighbors(node)) % 2 != 0 for node in self.nodes):
-                return False
-        # Perform DFS to check connectivity:
-        _dfs(start_node, visited)
-        return all(node in visited for node in self.nodes if self.get_neighbors(node))
+        return _has_eulerian_cycle(self)
 
     def has_eulerian_path(self):
-        def _dfs(start_node, visited):
-            stack = [start_node]
-            while stack:
-                node = stack.pop()
-                if node not in visited:
-                    visited.add(node)
-                    for neighbor, _ in self.get_neighbors(node):
-                        if neighbor not in visited:
-                            stack.append(neighbor)
-        visited = set()
-        start_node = next(iter(self.nodes))
-        # Ensure to start DFS from a node with neighbors
-        while start_node and not self.get_neighbors(start_node):
-            start_node = next(iter(self.nodes))
-        if not start_node:
-            return False  # No nodes with edges to start from
-        if self.directed:
-            start_nodes = end_nodes = 0
-            for node in self.nodes:
-                out_deg = self.out_degree(node)
-                in_deg = self.in_degree(node)
-                if out_deg == in_deg + 1:
-                    start_nodes += 1
-                elif in_deg == out_deg + 1:
-                    end_nodes += 1
-                elif in_deg != out_deg:
-                    return False
-            if not (start_nodes == 1 and end_nodes == 1) and not (start_nodes == 0 and end_nodes == 0):
-                return False
-        else:
-            odd_degree_nodes = sum(1 for node in self.nodes if len(self.get_neighbors(node)) % 2 != 0)
-            if odd_degree_nodes not in [0, 2]:
-                return False
+        return self.eulerian_path_start() is not None
+
+    def eulerian_path_start(self):
+        return _eulerian_path_start(self)
 
-        _dfs(start_node, visited)
-        return all(node in visited for node in self.nodes if self.get_neighbors(node))
+    def freeze(self):
+        # Build an immutable CSR copy of the graph, nodes are numbered in insertion order:
+        node_ids = list(self.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        indptr = array("q", [0])
+        indices = array("q")
+        weights = []
+        for node_id in node_ids:
+            for destination, weight in self.get_neighbors(node_id):
+                indices.append(index[destination])
+                weights.append(weight)
+            indptr.append(len(indices))
+        frozen = CSRGraph(self.directed, self.weighted, dict(self.nodes), node_ids, indptr, indices, weights)
+        frozen.version = self.version # Version of the graph the copy was made from
+        return frozen
+
+    def save(self, path):
+        self.freeze().save(path)
 
     def __eq__(self, other):
         if isinstance(other, Graph):
@@ -163,3 +513,340 @@ class Graph:
 
     def __repr__(self):
         return f"Graph(directed={self.directed}, weighted={self.weighted}, nodes={list(self.nodes.keys())}, edges={dict(self.edges)})"
+
+
+def _edges_connected(graph):
+    # Check that all the nodes with edges are in the same (weakly) connected component.
+    # Imported here, the algorithms package imports this module:
+    from algorithms.components import connected_components
+    labels = connected_components(graph)
+    components = {label for node, label in zip(graph.nodes, labels.tolist()) if graph.degree(node)}
+    return len(components) <= 1
+
+def _has_eulerian_cycle(graph):
+    if not graph.nodes:
+        return False
+    if graph.directed:
+        # Check in-degrees and out-degrees match for all nodes:
+        if any(graph.in_degree(node) != graph.out_degree(node) for node in graph.nodes):
+            return False
+    else:
+        # Check all nodes have even degrees:
+        if any(graph.out_degree(node) % 2 != 0 for node in graph.nodes):
+            return False
+    return _edges_connected(graph)
+
+def _eulerian_path_start(graph):
+    # Return the node an Eulerian path has to start from (any node with edges when
+    # the path is a cycle), or None if the graph has no Eulerian path:
+    start_node = next((node for node in graph.nodes if graph.out_degree(node)), None)
+    if start_node is None:
+        return None  # No nodes with edges to start from
+    if graph.directed:
+        start_nodes = end_nodes = 0
+        for node in graph.nodes:
+            out_deg = graph.out_degree(node)
+            in_deg = graph.in_degree(node)
+            if out_deg == in_deg + 1:
+                start_nodes += 1
+                start_node = node
+            elif in_deg == out_deg + 1:
+                end_nodes += 1
+            elif in_deg != out_deg:
+                return None
+        if not (start_nodes == 1 and end_nodes == 1) and not (start_nodes == 0 and end_nodes == 0):
+            return None
+    else:
+        odd_degree_nodes = [node for node in graph.nodes if graph.out_degree(node) % 2 != 0]
+        if len(odd_degree_nodes) not in [0, 2]:
+            return None
+        if odd_degree_nodes:
+            start_node = odd_degree_nodes[0]
+    return start_node if _edges_connected(graph) else None
+
+
+class MutationLog:
+    # Append-only record of the mutations of a graph as (version, event, *arguments) tuples,
+    # for caches, indexes and frozen copies that refresh from the version they last saw
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.entries = []
+        graph.subscribe(self._record)
+
+    def _record(self, event, *arguments):
+        self.entries.append((self.graph.version, event) + arguments)
+
+    def since(self, version):
+        return self.entries[bisect_right(self.entries, version, key=lambda entry: entry[0]):]
+
+    def truncate(self, version):
+        # Drop the entries every consumer has already seen:
+        del self.entries[:bisect_right(self.entries, version, key=lambda entry: entry[0])]
+
+    def close(self):
+        self.graph.unsubscribe(self._record)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _is_int64(weight):
+    # Python and NumPy integers fit the int64 weight arrays, booleans are not weights:
+    return isinstance(weight, Integral) and not isinstance(weight, bool) and -2**63 <= weight < 2**63
+
+def _insert(index, node, neighbor, edge):
+    # Add an edge to a node -> {neighbor: [Edge, ...]} index:
+    neighbors = index.get(node)
+    if neighbors is None:
+        index[node] = {neighbor: [edge]}
+    elif neighbor in neighbors:
+        neighbors[neighbor].append(edge)
+    else:
+        neighbors[neighbor] = [edge]
+
+def _insert_batch(index, nodes, codes, neighbors, edges):
+    # Add many edges to such an index, where nodes[codes[k]] is the node of edges[k]:
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.searchsorted(codes[order], np.arange(len(nodes) + 1)).tolist()
+    order = order.tolist()
+    if len(order) > 1:
+        take = itemgetter(*order)
+        neighbors, edges = take(neighbors), take(edges)
+    for node, start, end in zip(nodes, boundaries, boundaries[1:]):
+        if start == end:
+            continue
+        group = None
+        if node not in index:
+            # One list per neighbor, built in C, unless there are parallel edges:
+            group = dict(zip(neighbors[start:end], map(list, zip(edges[start:end]))))
+            if len(group) == end - start:
+                index[node] = group
+                continue
+        for neighbor, edge in zip(neighbors[start:end], edges[start:end]):
+            _insert(index, node, neighbor, edge)
+
+def _pop(index, node, neighbor):
+    # Remove and return the edges between node and neighbor from such an index:
+    neighbors = index.get(node)
+    if not neighbors or neighbor not in neighbors:
+        return ()
+    edges = neighbors.pop(neighbor)
+    if not neighbors:
+        del index[node]
+    return edges
+
+
+class EdgeView(Mapping):
+    # Read-only mapping of node -> list of outgoing (or incoming) Edge objects, built on demand
+
+    def __init__(self, graph, incoming=False):
+        self._graph = graph
+        self._incoming = incoming
+
+    def __getitem__(self, node_id):
+        if self._incoming:
+            edges = self._graph.get_incoming_edges(node_id)
+        else:
+            edges = self._graph.get_edges(node_id)
+        if not edges and node_id not in self._graph.nodes:
+            raise KeyError(node_id)
+        return edges
+
+    def __iter__(self):
+        degree = self._graph.in_degree if self._incoming else self._graph.out_degree
+        return (node_id for node_id in self._graph.nodes if degree(node_id))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class CSRGraph:
+    # Immutable compressed sparse row graph returned by Graph.freeze().
+    # Node ids are mapped to dense integers: the outgoing edges of node i are
+    # indices[indptr[i]:indptr[i + 1]] with matching entries in weights.
+
+    def __init__(self, directed, weighted, nodes, node_ids, indptr, indices, weights):
+        self.directed = directed
+        self.weighted = weighted
+        self.nodes = nodes
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.indptr = indptr
+        self.indices = indices
+        # Keep integer weights as integers so results match the mutable Graph:
+        if isinstance(weights, list):
+            if all(map(_is_int64, weights)):
+                weights = array("q", map(int, weights))
+            else:
+                weights = array("d", weights)
+        self.weights = weights
+        self.edges = EdgeView(self)
+        self.path = None # File the graph was loaded from, if any
+        self.version = None
+        self._in_degrees = None
+        self._transpose = None
+        self._components = {}
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def get_edges(self, node_id):
+        i = self.index.get(node_id)
+        if i is None:
+            return []
+        node_ids, indices, weights = self.node_ids, self.indices, self.weights
+        return [Edge(node_id, node_ids[indices[p]], weights[p]) for p in range(self.indptr[i], self.indptr[i + 1])]
+
+    def get_neighbors(self, node_id):
+        i = self.index[node_id]
+        node_ids, indices, weights = self.node_ids, self.indices, self.weights
+        return [(node_ids[indices[p]], weights[p]) for p in range(self.indptr[i], self.indptr[i + 1])]
+
+    def get_predecessors(self, node_id):
+        return self.transpose().get_neighbors(node_id)
+
+    def transpose(self):
+        # CSR graph with every edge reversed, built once with a counting sort:
+        if not self.directed:
+            return self
+        if self._transpose is None:
+            num_nodes = len(self.node_ids)
+            indptr, indices, weights = self.indptr, self.indices, self.weights
+            counts = array("q", bytes(8 * (num_nodes + 1)))
+            for j in indices:
+                counts[j + 1] += 1
+            for i in range(num_nodes):
+                counts[i + 1] += counts[i]
+            reverse_indptr = array("q", counts)
+            reverse_indices = array("q", bytes(8 * len(indices)))
+            typecode = getattr(weights, "typecode", None) or weights.format # Arrays or memoryviews
+            reverse_weights = array(typecode, bytes(weights.itemsize * len(weights)))
+            for i in range(num_nodes):
+                for p in range(indptr[i], indptr[i + 1]):
+                    j = indices[p]
+                    q = counts[j]
+                    reverse_indices[q] = i
+                    reverse_weights[q] = weights[p]
+                    counts[j] = q + 1
+            self._transpose = CSRGraph(self.directed, self.weighted, self.nodes, self.node_ids, reverse_indptr, reverse_indices, reverse_weights)
+            self._transpose._transpose = self
+        return self._transpose
+
+    def degree(self, node_id):
+        if not self.directed:
+            return self.out_degree(node_id)
+        return self.in_degree(node_id) + self.out_degree(node_id)
+
+    def in_degree(self, node_id):
+        if self._in_degrees is None:
+            in_degrees = array("q", bytes(8 * len(self.node_ids)))
+            for j in self.indices:
+                in_degrees[j] += 1
+            self._in_degrees = in_degrees
+        i = self.index.get(node_id)
+        return 0 if i is None else self._in_degrees[i]
+
+    def out_degree(self, node_id):
+        i = self.index.get(node_id)
+        return 0 if i is None else self.indptr[i + 1] - self.indptr[i]
+
+    def has_eulerian_cycle(self):
+        return _has_eulerian_cycle(self)
+
+    def has_eulerian_path(self):
+        return self.eulerian_path_start() is not None
+
+    def eulerian_path_start(self):
+        return _eulerian_path_start(self)
+
+    def save(self, path):
+        # Node ids must be integers, strings or other JSON values, and node data JSON values:
+        flags = (DIRECTED if self.directed else 0) | (WEIGHTED if self.weighted else 0)
+        if (getattr(self.weights, "typecode", None) or self.weights.format) == "d":
+            flags |= FLOAT_WEIGHTS
+        if sys.byteorder == "big":
+            flags |= BIG_ENDIAN
+        node_ids = list(self.node_ids)
+        integer_ids, id_section = _encode_node_ids(node_ids)
+        if integer_ids:
+            flags |= INTEGER_IDS
+        data = [[i, self.nodes[node_id].data] for i, node_id in enumerate(node_ids) if self.nodes[node_id].data is not None]
+        data_section = json.dumps(data).encode() if data else b""
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, flags, len(node_ids), self.num_edges, len(id_section), len(data_section)))
+            for section in (id_section, data_section):
+                file.write(section)
+                file.write(bytes(-len(section) % 8))
+            for values in (self.indptr, self.indices, self.weights):
+                file.write(values)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        # With mmap=True the arrays are memoryviews over a read-only memory map of the file,
+        # so nothing is copied and processes loading the same file share the page cache:
+        with open(path, "rb") as file:
+            if mmap:
+                buffer = memoryview(memory_map(file.fileno(), 0, access=ACCESS_READ))
+            else:
+                buffer = memoryview(file.read())
+        if len(buffer) < HEADER.size or buffer[:len(FORMAT_MAGIC)] != FORMAT_MAGIC:
+            raise ValueError(f"'{path}' is not a graph file.")
+        _, version, flags, num_nodes, num_edges, id_size, data_size = HEADER.unpack_from(buffer)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph file version {version}, expected {FORMAT_VERSION}.")
+        data_offset = HEADER.size + id_size + (-id_size % 8)
+        offset = data_offset + data_size + (-data_size % 8)
+        if len(buffer) < offset + 8 * (num_nodes + 1 + 2 * num_edges):
+            raise ValueError(f"'{path}' is truncated.")
+        swap = bool(flags & BIG_ENDIAN) != (sys.byteorder == "big")
+        node_ids = _decode_node_ids(buffer[HEADER.size:HEADER.size + id_size], flags & INTEGER_IDS, swap)
+        if len(node_ids) != num_nodes:
+            raise ValueError(f"'{path}' has a corrupted node id section.")
+        arrays = []
+        for typecode, length in (("q", num_nodes + 1), ("q", num_edges), ("d" if flags & FLOAT_WEIGHTS else "q", num_edges)):
+            values = buffer[offset:offset + 8 * length]
+            if mmap and not swap:
+                values = values.cast(typecode)
+            else:
+                # Copy into a regular array, which can also fix the byte order:
+                values = array(typecode, values.tobytes())
+                if swap:
+                    values.byteswap()
+            arrays.append(values)
+            offset += 8 * length
+        nodes = {node_id: Node(node_id) for node_id in node_ids}
+        if data_size:
+            for i, data in json.loads(buffer[data_offset:data_offset + data_size].tobytes()):
+                nodes[node_ids[i]].data = data
+        graph = cls(bool(flags & DIRECTED), bool(flags & WEIGHTED), nodes, node_ids, *arrays)
+        graph.path = path
+        return graph
+
+    def __repr__(self):
+        return f"CSRGraph(directed={self.directed}, weighted={self.weighted}, nodes={len(self.node_ids)}, edges={self.num_edges})"
+
+
+def _encode_node_ids(node_ids):
+    # (integer ids, section bytes): an int64 array when every id is an integer, a JSON array otherwise:
+    if all(type(node_id) is int and -2**63 <= node_id < 2**63 for node_id in node_ids):
+        return True, array("q", node_ids).tobytes()
+    if not all(node_id is None or type(node_id) in (str, int, float, bool) for node_id in node_ids):
+        raise ValueError("Only integer, string, float, boolean or None node ids can be saved.")
+    return False, json.dumps(node_ids).encode()
+
+def _decode_node_ids(section, integer_ids, swap):
+    if not integer_ids:
+        return json.loads(section.tobytes())
+    node_ids = array("q", section.tobytes())
+    if swap:
+        node_ids.byteswap()
+    return node_ids.tolist()
+
+def load(path, mmap=True):
+    # Read a graph written by Graph.save() or CSRGraph.save() as a CSRGraph:
+    return CSRGraph.load(path, mmap)
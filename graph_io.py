@@ -0,0 +1,227 @@
+"""
+Graph Input/Output
+
+Streaming readers and writers for edge lists, CSV, JSON Lines and a GraphML subset. Readers parse
+the file lazily and feed the graph in chunks through add_nodes_from / add_edges_from, so only
+one chunk of edges is ever held as Python objects. Writers walk the graph and write it out in
+chunks. Paths ending in ".gz" are read and written with gzip.
+
+Readers:
+- read_edgelist(path, graph=None, directed=False, weighted=False, compact=False, delimiter=None,
+  comments="#", nodetype=str, chunk_size=100000): one "origin destination [weight]" edge per line.
+- read_csv(path, ..., source="source", target="target", weight="weight", header=True): one edge per
+  row, with the columns picked by name from the header row (or the first three columns without one).
+- read_jsonl(path, ...): one JSON object per line, {"node": id, "data": data} for nodes and
+  {"source": id, "target": id, "weight": weight} for edges. Node records can come in any order,
+  the data of a node that already exists is replaced.
+- read_graphml(path, ..., directed=None): <node id="..."/> and <edge source="..." target="..."/>
+  elements, with the weight in the <data> child whose key is the id of the edge <key> declared with
+  attr.name="weight" (like the files of networkx.write_graphml). directed=None uses the edgedefault
+  of the file.
+
+  Edges are added to graph when given, otherwise to a new Graph(directed, weighted, compact).
+  Nodes are created as they first appear. Every reader returns the graph.
+
+Writers:
+- write_edgelist(graph, path, delimiter=" "), write_csv(graph, path), write_jsonl(graph, path) and
+  write_graphml(graph, path), all with a chunk_size=100000 parameter. They accept a Graph or a CSRGraph
+  and write each undirected edge once.
+"""
+
+import csv
+import gzip
+import json
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import quoteattr
+from graph import Graph
+
+CHUNK_SIZE = 100000
+
+def read_edgelist(path, graph=None, directed=False, weighted=False, compact=False, delimiter=None, comments="#", nodetype=str, chunk_size=CHUNK_SIZE):
+    graph = _target(graph, directed, weighted, compact)
+    with _open(path, "r") as file:
+        edges = (
+            _edge(fields, nodetype)
+            for fields in (line.split(comments, 1)[0].split(delimiter) for line in file)
+            if fields
+        )
+        _add_edges(graph, edges, chunk_size)
+    return graph
+
+def read_csv(path, graph=None, directed=False, weighted=False, compact=False, source="source", target="target", weight="weight", header=True, nodetype=str, chunk_size=CHUNK_SIZE):
+    graph = _target(graph, directed, weighted, compact)
+    with _open(path, "r") as file:
+        rows = csv.reader(file)
+        columns = [0, 1, 2]
+        if header:
+            names = next(rows, [])
+            if source not in names or target not in names:
+                raise ValueError(f"CSV header must have '{source}' and '{target}' columns.")
+            columns = [names.index(source), names.index(target)]
+            if weight in names:
+                columns.append(names.index(weight))
+        edges = (_edge([row[i] for i in columns if i < len(row)], nodetype) for row in rows if row)
+        _add_edges(graph, edges, chunk_size)
+    return graph
+
+def read_jsonl(path, graph=None, directed=False, weighted=False, compact=False, chunk_size=CHUNK_SIZE):
+    graph = _target(graph, directed, weighted, compact)
+
+    def _edges(file):
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "node" in record:
+                node = graph.nodes.get(record["node"])
+                if node is None:
+                    graph.add_node(record["node"], record.get("data"))
+                elif "data" in record:
+                    node.data = record["data"] # Already created by an edge of an earlier chunk
+            else:
+                yield (record["source"], record["target"], record.get("weight", 1))
+
+    with _open(path, "r") as file:
+        _add_edges(graph, _edges(file), chunk_size)
+    return graph
+
+def read_graphml(path, graph=None, directed=None, weighted=False, compact=False, nodetype=str, chunk_size=CHUNK_SIZE):
+    edges = []
+    weight_keys = set() # Ids of the <key> elements declaring the edge weight
+    with _open(path, "rb") as file:
+        for event, element in iterparse(file, events=("start", "end")):
+            tag = element.tag.rsplit("}", 1)[-1] # Drop the XML namespace
+            if event == "start":
+                if tag == "graph" and graph is None:
+                    if directed is None:
+                        directed = element.get("edgedefault", "undirected") == "directed"
+                    graph = Graph(directed=directed, weighted=weighted, compact=compact)
+                if tag == "graph":
+                    container = element
+                continue
+            if tag == "key":
+                if element.get("for") in ("edge", "all") and element.get("attr.name") == "weight":
+                    weight_keys.add(element.get("id"))
+                continue
+            if tag == "node":
+                graph.add_node(nodetype(element.get("id")))
+            elif tag == "edge":
+                weight = 1
+                for child in element:
+                    # Files without key declarations name the data "weight" directly:
+                    if child.tag.rsplit("}", 1)[-1] == "data" and child.get("key") in (weight_keys or {"weight"}):
+                        weight = _number(child.text)
+                edges.append((nodetype(element.get("source")), nodetype(element.get("target")), weight))
+                if len(edges) >= chunk_size:
+                    _add_edges(graph, edges, chunk_size)
+                    edges = []
+            else:
+                continue
+            del container[:] # Parsed elements are not kept in memory
+    if graph is None:
+        raise ValueError(f"'{path}' has no <graph> element.")
+    _add_edges(graph, edges, chunk_size)
+    return graph
+
+def write_edgelist(graph, path, delimiter=" ", chunk_size=CHUNK_SIZE):
+    def _line(origin, destination, weight):
+        fields = [origin, destination, weight] if graph.weighted else [origin, destination]
+        return delimiter.join(map(str, fields)) + "\n"
+
+    _write(path, (_line(*edge) for edge in iter_edges(graph)), chunk_size)
+
+def write_csv(graph, path, chunk_size=CHUNK_SIZE):
+    with _open(path, "w") as file:
+        writer = csv.writer(file)
+        writer.writerow(["source", "target", "weight"] if graph.weighted else ["source", "target"])
+        edges = iter_edges(graph)
+        if not graph.weighted:
+            edges = (edge[:2] for edge in edges)
+        for chunk in _chunks(edges, chunk_size):
+            writer.writerows(chunk)
+
+def write_jsonl(graph, path, chunk_size=CHUNK_SIZE):
+    # Nodes come first, which keeps isolated nodes, node data and the node order:
+    def _lines():
+        for node in graph.nodes.values():
+            record = {"node": node.id} if node.data is None else {"node": node.id, "data": node.data}
+            yield json.dumps(record) + "\n"
+        for origin, destination, weight in iter_edges(graph):
+            yield json.dumps({"source": origin, "target": destination, "weight": weight}) + "\n"
+
+    _write(path, _lines(), chunk_size)
+
+def write_graphml(graph, path, chunk_size=CHUNK_SIZE):
+    def _lines():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        yield '  <key id="weight" for="edge" attr.name="weight" attr.type="double"/>\n'
+        yield f'  <graph edgedefault="{"directed" if graph.directed else "undirected"}">\n'
+        for node_id in graph.nodes:
+            yield f"    <node id={quoteattr(str(node_id))}/>\n"
+        for origin, destination, weight in iter_edges(graph):
+            edge = f"    <edge source={quoteattr(str(origin))} target={quoteattr(str(destination))}"
+            if graph.weighted:
+                yield f'{edge}><data key="weight">{weight}</data></edge>\n'
+            else:
+                yield f"{edge}/>\n"
+        yield "  </graph>\n</graphml>\n"
+
+    _write(path, _lines(), chunk_size)
+
+def iter_edges(graph):
+    # Yield every edge once as (origin, destination, weight). Undirected edges are stored in
+    # both directions: only the copy leaving the node added first is kept, and every other
+    # copy of a self-loop (both copies are stored next to each other):
+    position = {node_id: i for i, node_id in enumerate(graph.nodes)}
+    for origin in graph.nodes:
+        skip_loop = False
+        for destination, weight in graph.get_neighbors(origin):
+            if graph.directed or position[origin] < position[destination]:
+                yield origin, destination, weight
+            elif origin == destination:
+                if not skip_loop:
+                    yield origin, destination, weight
+                skip_loop = not skip_loop
+
+def _target(graph, directed, weighted, compact):
+    return Graph(directed=directed, weighted=weighted, compact=compact) if graph is None else graph
+
+def _open(path, mode):
+    # Text files are opened with newline="" so that the csv module sees the raw line endings:
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode) if "b" in mode else gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode) if "b" in mode else open(path, mode, encoding="utf-8", newline="")
+
+def _chunks(items, chunk_size):
+    items = iter(items)
+    chunk = list(islice(items, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, chunk_size))
+
+def _add_edges(graph, edges, chunk_size):
+    # Create the missing endpoints of each chunk, then add its edges in one call:
+    for chunk in _chunks(edges, chunk_size):
+        graph.add_nodes_from(node for edge in chunk for node in edge[:2])
+        graph.add_edges_from(chunk)
+
+def _write(path, lines, chunk_size):
+    with _open(path, "w") as file:
+        for chunk in _chunks(lines, chunk_size):
+            file.writelines(chunk)
+
+def _edge(fields, nodetype):
+    if len(fields) < 2:
+        raise ValueError(f"Expected 'origin destination [weight]', got {fields}.")
+    if len(fields) == 2:
+        return nodetype(fields[0]), nodetype(fields[1])
+    return nodetype(fields[0]), nodetype(fields[1]), _number(fields[2])
+
+def _number(text):
+    # Keep integer weights as integers, like the rest of the project:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
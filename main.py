@@ -20,8 +20,7 @@ def run():
         "FG", 
         "DES"
     ]
-    for node in nodes:
-        graph.add_node(node)
+    graph.add_nodes_from(nodes)
     edges = [
         ("UAEH", "FDA", 400),
         ("FDA", "FDP", 1200),
@@ -39,8 +38,7 @@ def run():
         ("LAV", "FG", 350),
         ("FG", "DES", 250)
     ]
-    for source, destination, weight in edges:
-        graph.add_edge(source, destination, weight)
+    graph.add_edges_from(edges)
 
     # Dijkstra's algorithm:
     shortest_path = dijkstra(graph, "UAEH", "DES")
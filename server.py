@@ -0,0 +1,171 @@
+"""
+Graph Query Server
+
+A small asyncio server that loads a graph once and answers queries over a JSON Lines protocol,
+so clients don't have to build the graph themselves. Every request is one JSON object per line
+with an "id" and an "op", and gets one response line with the same id and either a "result" or
+an "error". Responses are written as soon as they are ready, so they can come out of order.
+
+Operations:
+- {"op": "dijkstra", "source": s, "target": t}: [distance, path_edges] or null, like dijkstra().
+  Concurrent requests are micro-batched: they are collected for batch_delay seconds (or until
+  max_batch of them are waiting) and answered with dijkstra_many(), which runs one search per source.
+- {"op": "dijkstra", "source": s}: {node: [distance, path_edges]} for every reachable node.
+- {"op": "bfs", "source": s} and {"op": "dfs", "source": s}: the traversal order.
+- {"op": "mst", "algorithm": "kruskal" | "boruvka" | "prim", "source": s}: the [origin, destination, weight]
+  edges of the minimum spanning tree (prim starts from source, or from the first node).
+- {"op": "eulerian", "source": s}: the Eulerian path or cycle from hierholzer(), source is optional.
+
+Searches run in a thread pool, so the event loop keeps reading requests while they run.
+Run it with: python server.py graph.bin [--host 127.0.0.1] [--port 8765], where graph.bin
+was written by Graph.save().
+"""
+
+import argparse
+import asyncio
+import json
+from algorithms import bfs, boruvka, dfs, dijkstra, dijkstra_many, hierholzer, kruskal, prim
+from graph import Graph, load
+from utils.errors import NodeNotFoundError
+
+class GraphServer:
+
+    def __init__(self, graph, batch_delay=0.002, max_batch=256):
+        # Mutable graphs are frozen, queries are faster on the CSR arrays:
+        self.graph = graph.freeze() if isinstance(graph, Graph) else graph
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self._pending = [] # (source, target, future) of the next shortest path batch
+        self._flush_handle = None
+        self._batch_tasks = set() # The event loop only keeps weak references to tasks
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self._serve_client, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def query(self, request):
+        # Answer one request dictionary with a response dictionary, every failure becomes an error:
+        response = {"id": request.get("id")}
+        try:
+            response["result"] = await self._run(request)
+        except Exception as error:
+            response["error"] = f"{type(error).__name__}: {error}"
+        return response
+
+    async def shortest_path(self, source, target):
+        for node in (source, target):
+            if node not in self.graph.nodes:
+                raise NodeNotFoundError(node)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((source, target, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._answer_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _answer_batch(self, batch):
+        pairs = [(source, target) for source, target, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, dijkstra_many, self.graph, pairs)
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.cancelled():
+                    future.set_exception(error)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.cancelled():
+                future.set_result(result)
+
+    async def _run(self, request):
+        op = request["op"]
+        source = request.get("source")
+        if op == "dijkstra" and request.get("target") is not None:
+            return await self.shortest_path(source, request["target"])
+        if op == "dijkstra":
+            return await self._in_thread(dijkstra, self.graph, source)
+        if op == "bfs":
+            return await self._in_thread(bfs, self.graph, source)
+        if op == "dfs":
+            return await self._in_thread(dfs, self.graph, source)
+        if op == "mst":
+            algorithm = request.get("algorithm", "kruskal")
+            if algorithm in ("kruskal", "boruvka"):
+                edges = await self._in_thread(kruskal if algorithm == "kruskal" else boruvka, self.graph)
+                return [[edge.origin, edge.destination, edge.weight] for edge in edges]
+            if algorithm == "prim":
+                if source is None and not self.graph.nodes:
+                    raise ValueError("The graph is empty.")
+                start = source if source is not None else next(iter(self.graph.nodes))
+                return await self._in_thread(prim, self.graph, start)
+            raise ValueError(f"Unknown MST algorithm '{algorithm}'.")
+        if op == "eulerian":
+            return await self._in_thread(hierholzer, self.graph, source)
+        raise ValueError(f"Unknown operation '{op}'.")
+
+    async def _in_thread(self, function, *args):
+        for node in args[1:]:
+            if node is not None and node not in self.graph.nodes:
+                raise NodeNotFoundError(node)
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def _serve_client(self, reader, writer):
+        tasks = set()
+
+        async def _respond(line):
+            request_id = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Requests must be JSON objects.")
+                request_id = request.get("id")
+                response = json.dumps(await self.query(request))
+            except Exception as error:
+                # Invalid JSON, or a result that can't be serialized:
+                response = json.dumps({"id": request_id, "error": f"{type(error).__name__}: {error}"}, default=str)
+            writer.write(response.encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.ensure_future(_respond(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+async def serve(graph, host="127.0.0.1", port=8765, **kwargs):
+    server = GraphServer(graph, **kwargs)
+    async with await server.start(host, port) as running:
+        await running.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve graph queries over JSON Lines.")
+    parser.add_argument("path", help="Graph file written by Graph.save()")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    arguments = parser.parse_args()
+    asyncio.run(serve(load(arguments.path), arguments.host, arguments.port))
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,6 @@
 from .test_graph import TestGraph
 from .test_algorithms import TestAlgorithms
+from .test_graph_io import TestGraphIO
+from .test_concurrent_graph import TestConcurrentGraph
+from .test_server import TestGraphServer
+from .test_benchmarks import TestBenchmarks
@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
-from graph import Graph
+from graph import Graph, CSRGraph
+from algorithms import all_pairs_dijkstra, astar, bidirectional_dijkstra, boruvka, build_contraction_hierarchy, connected_components, ContractionHierarchy, bfs, bfs_levels, dfs, iter_bfs, iter_dfs, dijkstra, dijkstra_many, distance_matrix, DynamicShortestPaths, hierholzer, kruskal, kruskal_stream, minimum_spanning_forest, prim, ShortestPathCache, strongly_connected_components
 from utils.errors import NodeNotFoundError, EdgeNotFoundError
 
 class TestGraph(unittest.TestCase):
@@ -42,5 +45,325 @@ class TestGraph(unittest.TestCase):
         self.graph.remove_edge("A", "B")
         self.assertNotIn(("A", "B", 2), self.graph.edges)
 
+class TestAlgorithms(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph(directed=False, weighted=True)
+        for node in ["A", "B", "C", "D", "E", "F"]:
+            self.graph.add_node(node)
+        edges = [
+            ("A", "C", 1), ("A", "E", 2), ("B", "C", 3),
+            ("B", "D", 4), ("C", "D", 5), ("C", "E", 6),
+            ("D", "E", 7), ("D", "F", 8), ("E", "F", 9),
+        ]
+        for origin, destination, weight in edges:
+            self.graph.add_edge(origin, destination, weight=weight)
+
+    def test_freeze(self):
+        frozen = self.graph.freeze()
+        self.assertIsInstance(frozen, CSRGraph)
+        self.assertEqual(frozen.num_edges, 18)
+        self.assertEqual(frozen.get_neighbors("A"), self.graph.get_neighbors("A"))
+        self.assertEqual(frozen.edges["D"], self.graph.edges["D"])
+        self.assertEqual(frozen.degree("C"), self.graph.degree("C"))
+
+    def test_frozen_traversals(self):
+        frozen = self.graph.freeze()
+        self.assertEqual(bfs(frozen, "A"), bfs(self.graph, "A"))
+        self.assertEqual(dfs(frozen, "A"), dfs(self.graph, "A"))
+
+    def test_frozen_dijkstra(self):
+        frozen = self.graph.freeze()
+        self.assertEqual(dijkstra(frozen, "A", "F"), dijkstra(self.graph, "A", "F"))
+        self.assertEqual(dijkstra(frozen, "A"), dijkstra(self.graph, "A"))
+
+    def test_frozen_spanning_trees(self):
+        frozen = self.graph.freeze()
+        self.assertEqual(sum(edge.weight for edge in kruskal(frozen)), 18)
+        self.assertEqual(sum(weight for _, _, weight in prim(frozen, "A")), 18)
+
+    def test_frozen_hierholzer(self):
+        graph = Graph()
+        for node in ["A", "B", "C"]:
+            graph.add_node(node)
+        graph.add_edge("A", "B")
+        graph.add_edge("B", "C")
+        graph.add_edge("C", "A")
+        self.assertEqual(len(hierholzer(graph.freeze(), "A")), 4)
+        self.assertEqual(len(hierholzer(self.graph.freeze(), "A")), 10)
+        graph.add_node("D")
+        graph.add_edge("A", "D")
+        graph.add_edge("B", "D")
+        graph.add_edge("C", "D")
+        self.assertIsNone(hierholzer(graph.freeze(), "A"))
+
+    def test_dijkstra_many(self):
+        pairs = [("A", "F"), ("B", "E"), ("A", "D"), ("F", "F")]
+        expected = [dijkstra(self.graph, start, end) for start, end in pairs]
+        self.assertEqual(dijkstra_many(self.graph, pairs), expected)
+        self.assertEqual(dijkstra_many(self.graph.freeze(), pairs), expected)
+
+    def test_distance_matrix(self):
+        self.graph.add_node("G")
+        matrix = distance_matrix(self.graph, ["A", "F"], ["B", "G"])
+        self.assertEqual(matrix, [[4, float('inf')], [12, float('inf')]])
+        self.assertEqual(distance_matrix(self.graph.freeze(), ["A", "F"], ["B", "G"]), matrix)
+
+    def test_all_pairs_dijkstra(self):
+        self.graph.add_node("G")
+        expected = distance_matrix(self.graph, list(self.graph.nodes))
+        for workers in (1, 2):
+            matrix = all_pairs_dijkstra(self.graph, workers=workers, matrix=True)
+            self.assertEqual(matrix.tolist(), expected)
+        rows = all_pairs_dijkstra(self.graph, ["F", "A"], ["B", "G"], workers=2, chunk_size=1)
+        self.assertEqual([(source, list(row)) for source, row in rows], [("F", [12, float('inf')]), ("A", [4, float('inf')])])
+        # Targets can be a generator:
+        rows = all_pairs_dijkstra(self.graph, ["A"], (node for node in "BC"), workers=1)
+        self.assertEqual([(source, list(row)) for source, row in rows], [("A", [4, 1])])
+        self.assertEqual(all_pairs_dijkstra(self.graph, ["A"], iter("BC"), workers=1, matrix=True).tolist(), [[4, 1]])
+        # Workers get dense indices, so node ids don't need to fit the file format:
+        grid = Graph(directed=False, weighted=True)
+        grid.add_nodes_from([(0, 0), (0, 1), (1, 0), (1, 1)])
+        grid.add_edges_from([((0, 0), (0, 1), 1), ((0, 1), (1, 1), 2), ((1, 1), (1, 0), 3), ((1, 0), (0, 0), 4)])
+        expected = all_pairs_dijkstra(grid, workers=1, matrix=True).tolist()
+        self.assertEqual(all_pairs_dijkstra(grid, workers=2, matrix=True).tolist(), expected)
+        rows = all_pairs_dijkstra(grid, [(1, 1)], [(0, 0), (1, 0)], workers=2)
+        self.assertEqual([(source, list(row)) for source, row in rows], [((1, 1), [3, 3])])
+        with self.assertRaises(NodeNotFoundError):
+            all_pairs_dijkstra(self.graph, ["Z"])
+
+    def test_shortest_path_cache(self):
+        cache = ShortestPathCache(self.graph, maxsize=2)
+        self.assertEqual(cache.dijkstra("A", "F"), dijkstra(self.graph, "A", "F"))
+        self.assertEqual(cache.dijkstra("A", "B"), dijkstra(self.graph, "A", "B"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # A heavier edge and the removal of a non-tree edge keep the tree:
+        self.graph.add_edge("A", "F", 20)
+        self.graph.remove_edge("D", "F")
+        self.graph.add_node("G")
+        self.graph.set_weight("A", "F", 25)
+        cache.dijkstra("A", "F")
+        self.assertEqual(cache.info().evictions, 0)
+        # A shortcut or the removal of a tree edge evicts it:
+        self.graph.add_edge("A", "F", 1)
+        self.assertEqual(cache.dijkstra("A", "F"), [1, [("A", "F")]])
+        self.graph.remove_edge("A", "F")
+        self.assertEqual(cache.dijkstra("A", "F"), dijkstra(self.graph, "A", "F"))
+        self.assertEqual(cache.info(), (2, 3, 2, 2, 1))
+        cache.close()
+        self.graph.remove_node("A")
+        self.assertEqual(cache.info().currsize, 0)
+
+    def test_dynamic_shortest_paths(self):
+        paths = DynamicShortestPaths(self.graph, "A")
+        self.assertEqual(dict(paths), dijkstra(self.graph, "A"))
+        self.graph.add_edge("A", "F", 3)
+        self.assertEqual(paths.distance_to("F"), 3)
+        self.graph.remove_edge("A", "C")
+        self.assertEqual(dict(paths), dijkstra(self.graph, "A"))
+        self.graph.remove_node("E")
+        self.assertEqual(dict(paths), dijkstra(self.graph, "A"))
+        self.graph.set_weight("A", "F", 30)
+        self.graph.update_weights([("D", "F", 1), ("B", "D", 9)])
+        self.assertEqual(dict(paths), dijkstra(self.graph, "A"))
+        paths.close()
+        self.graph.add_edge("A", "B", 1)
+        self.assertNotEqual(paths.distance_to("B"), 1)
+
+    def test_dijkstra_lazy_tree(self):
+        tree = dijkstra(self.graph, "A", lazy=True)
+        self.assertEqual(tree.distance_to("F"), 11)
+        self.assertEqual(tree.path_to("F"), [("A", "E"), ("E", "F")])
+        self.assertEqual(dict(tree), dijkstra(self.graph, "A"))
+        self.assertEqual(dict(dijkstra(self.graph.freeze(), "A", lazy=True)), dict(tree))
+
+    def test_dijkstra_early_exit(self):
+        self.graph.add_node("G")
+        self.assertIsNone(dijkstra(self.graph, "A", "G"))
+        self.assertEqual(dijkstra(self.graph, "A", "C"), [1, [("A", "C")]])
+        self.assertEqual(dijkstra(self.graph.freeze(), "A", "C"), [1, [("A", "C")]])
+        self.assertIsNone(dijkstra(self.graph.freeze(), "A", "G"))
+
+    def test_astar(self):
+        pos = {"A": (0, 0), "B": (3, 1), "C": (1, 0), "D": (4, 2), "E": (0, 2), "F": (3, 6)}
+        expected = dijkstra(self.graph, "A", "F")
+        self.assertEqual(astar(self.graph, "A", "F", pos=pos), expected)
+        self.assertEqual(astar(self.graph, "A", "F", heuristic="haversine", pos=pos, scale=1e-6), expected)
+        self.assertEqual(astar(self.graph.freeze(), "A", "F"), expected)
+        self.graph.add_node("G")
+        self.assertIsNone(astar(self.graph, "A", "G", pos={**pos, "G": (9, 9)}))
+
+    def test_bidirectional_dijkstra(self):
+        for start, goal in [("A", "F"), ("B", "E"), ("F", "A"), ("C", "C")]:
+            self.assertEqual(bidirectional_dijkstra(self.graph, start, goal)[0], dijkstra(self.graph, start, goal)[0])
+        graph = Graph(directed=True, weighted=True)
+        for node in ["A", "B", "C", "D"]:
+            graph.add_node(node)
+        graph.add_edge("A", "B", 1)
+        graph.add_edge("B", "C", 1)
+        graph.add_edge("A", "C", 5)
+        graph.add_edge("C", "D", 1)
+        self.assertEqual(bidirectional_dijkstra(graph, "A", "D"), [3, [("A", "B"), ("B", "C"), ("C", "D")]])
+        self.assertEqual(bidirectional_dijkstra(graph.freeze(), "A", "D"), [3, [("A", "B"), ("B", "C"), ("C", "D")]])
+        self.assertIsNone(bidirectional_dijkstra(graph, "D", "A"))
+
+    def test_contraction_hierarchy(self):
+        hierarchy = build_contraction_hierarchy(self.graph)
+        for start in self.graph.nodes:
+            for goal in self.graph.nodes:
+                self.assertEqual(hierarchy.shortest_path(start, goal)[0], dijkstra(self.graph, start, goal)[0])
+        self.assertEqual(hierarchy.shortest_path("B", "E"), [6, [("B", "C"), ("C", "A"), ("A", "E")]])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.ch")
+            hierarchy.save(path)
+            loaded = ContractionHierarchy.load(path)
+            self.graph.set_weight("A", "C", 0.5)
+            float_hierarchy = build_contraction_hierarchy(self.graph)
+            float_hierarchy.save(path)
+            float_loaded = ContractionHierarchy.load(path)
+            with open(path, "wb") as file:
+                file.write(b"\x80\x04not a hierarchy")
+            with self.assertRaises(ValueError):
+                ContractionHierarchy.load(path)
+        self.assertEqual(loaded.distance("F", "C"), 12)
+        self.assertEqual(loaded.shortest_path("B", "E"), hierarchy.shortest_path("B", "E"))
+        for original, copy in ((hierarchy, loaded), (float_hierarchy, float_loaded)):
+            self.assertEqual((copy.node_ids, copy.rank, copy.upward, copy.downward, copy.middle, copy.directed),
+                             (original.node_ids, original.rank, original.upward, original.downward, original.middle, original.directed))
+        self.assertEqual(float_loaded.distance("B", "E"), 5.5)
+
+    def test_traversal_order(self):
+        self.assertEqual(bfs(self.graph, "A"), ["A", "C", "E", "B", "D", "F"])
+        self.assertEqual(dfs(self.graph, "A"), ["A", "C", "B", "D", "E", "F"])
+        self.assertEqual(bfs(self.graph, "X"), [])
+
+    def test_iterative_traversals(self):
+        graph = Graph(directed=True)
+        for node in range(5000):
+            graph.add_node(node)
+        for node in range(4999):
+            graph.add_edge(node, node + 1)
+        self.assertEqual(dfs(graph, 0), list(range(5000)))
+        self.assertEqual(dfs(graph.freeze(), 0), list(range(5000)))
+        walk = iter_dfs(graph, 0)
+        self.assertEqual([next(walk) for _ in range(3)], [0, 1, 2])
+        self.assertEqual(next(iter_bfs(self.graph.freeze(), "F")), "F")
+
+    def test_bfs_levels(self):
+        self.graph.add_node("G")
+        self.assertEqual(bfs_levels(self.graph, "A").tolist(), [0, 2, 1, 2, 1, 2, -1])
+        self.assertEqual(bfs_levels(self.graph.freeze(), ["B", "F"]).tolist(), [2, 0, 1, 1, 1, 0, -1])
+        self.assertEqual(bfs_levels(self.graph, ["A"], max_depth=1).tolist(), [0, -1, 1, -1, 1, -1, -1])
+
+    def test_kruskal(self):
+        mst = kruskal(self.graph)
+        self.assertEqual(len(mst), 5)
+        self.assertEqual(sum(edge.weight for edge in mst), 18)
+        self.assertEqual(sorted(edge.weight for edge in mst), sorted(edge.weight for edge in kruskal(self.graph.freeze())))
+
+    def test_kruskal_stream(self):
+        edges = iter([("A", "B", 1), ("B", "C", 1), ("A", "C", 2), ("C", "D", 3), ("B", "D", 4)])
+        mst = kruskal_stream(edges, num_nodes=4)
+        self.assertEqual([(edge.origin, edge.destination) for edge in mst], [("A", "B"), ("B", "C"), ("C", "D")])
+        self.assertEqual(next(edges), ("B", "D", 4))
+        with self.assertRaises(ValueError):
+            kruskal_stream([("A", "B", 2), ("B", "C", 1)])
+
+    def test_boruvka(self):
+        self.graph.add_edge("A", "B", 3) # Ties with B - C
+        self.graph.add_node("G")
+        self.graph.add_node("H")
+        self.graph.add_edge("G", "H", 2)
+        mst = boruvka(self.graph)
+        self.assertEqual(mst, kruskal(self.graph))
+        self.assertEqual(boruvka(self.graph.freeze()), mst)
+        self.assertEqual(sum(edge.weight for edge in mst), 20)
+        self.assertEqual(boruvka(Graph()), [])
+
+    def test_prim_parents(self):
+        mst = prim(self.graph, "A")
+        self.assertEqual(mst, [("A", "C", 1), ("A", "E", 2), ("C", "B", 3), ("B", "D", 4), ("D", "F", 8)])
+        self.assertEqual(prim(self.graph, "A", dense=True), mst)
+        self.assertEqual(prim(self.graph.freeze(), "A"), mst)
+        self.assertEqual(prim(self.graph.freeze(), "A", dense=True), mst)
+
+    def test_minimum_spanning_forest(self):
+        for node in ["G", "H", "I"]:
+            self.graph.add_node(node)
+        self.graph.add_edge("G", "H", 2)
+        self.graph.add_edge("H", "I", 1)
+        self.graph.add_edge("G", "I", 5)
+        for forest in (minimum_spanning_forest(self.graph), minimum_spanning_forest(self.graph, dense=True),
+                       minimum_spanning_forest(self.graph.freeze())):
+            self.assertEqual(len(forest), 7)
+            self.assertEqual(sum(weight for _, _, weight in forest), 21)
+
+    def test_connected_components(self):
+        self.graph.add_node("G")
+        self.graph.add_node("H")
+        self.graph.add_edge("H", "G", 1)
+        labels = connected_components(self.graph)
+        self.assertEqual(labels.tolist(), [0, 0, 0, 0, 0, 0, 1, 1])
+        self.assertIs(connected_components(self.graph), labels) # Cached until the next mutation
+        self.assertEqual(connected_components(self.graph.freeze()).tolist(), labels.tolist())
+        self.graph.remove_edge("H", "G")
+        self.assertEqual(connected_components(self.graph).tolist(), [0, 0, 0, 0, 0, 0, 1, 2])
+        self.assertEqual(strongly_connected_components(self.graph).tolist(), [0, 0, 0, 0, 0, 0, 1, 2])
+
+    def test_strongly_connected_components(self):
+        graph = Graph(directed=True)
+        graph.add_nodes_from(range(6))
+        graph.add_edges_from([(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 3), (5, 4)])
+        for version in (graph, graph.freeze()):
+            self.assertEqual(strongly_connected_components(version).tolist(), [0, 0, 0, 1, 1, 2])
+            self.assertEqual(connected_components(version).tolist(), [0, 0, 0, 0, 0, 0])
+        # Long paths don't hit the recursion limit:
+        path = Graph(directed=True)
+        path.add_nodes_from(range(20000))
+        path.add_edges_from([(i, i + 1) for i in range(19999)] + [(19999, 0)])
+        self.assertEqual(set(strongly_connected_components(path).tolist()), {0})
+        self.assertTrue(path.has_eulerian_cycle())
+
+    def test_hierholzer_multigraph(self):
+        graph = Graph()
+        for node in ["A", "B", "C"]:
+            graph.add_node(node)
+        graph.add_edge("A", "B")
+        graph.add_edge("A", "B")
+        graph.add_edge("B", "C")
+        path = hierholzer(graph)
+        self.assertEqual(path, ["B", "A", "B", "C"])
+        self.assertEqual(hierholzer(graph.freeze()), path)
+        self.assertEqual(hierholzer(graph, "C"), ["C", "B", "A", "B"])
+        self.assertIsNone(hierholzer(graph, "A"))
+
+    def test_hierholzer_directed(self):
+        graph = Graph(directed=True)
+        for node in ["A", "B", "C", "D"]:
+            graph.add_node(node)
+        for origin, destination in [("A", "B"), ("B", "C"), ("C", "A"), ("A", "D")]:
+            graph.add_edge(origin, destination)
+        self.assertEqual(hierholzer(graph), ["A", "B", "C", "A", "D"])
+        self.assertEqual(hierholzer(graph.freeze()), ["A", "B", "C", "A", "D"])
+        self.assertIsNone(hierholzer(graph, "B"))
+        graph.add_edge("D", "C")
+        self.assertEqual(hierholzer(graph), ["A", "B", "C", "A", "D", "C"])
+        graph.add_edge("B", "D")
+        self.assertIsNone(hierholzer(graph))
+
+    def test_compact_graph_algorithms(self):
+        compact = Graph(directed=False, weighted=True, compact=True)
+        for node in self.graph.nodes:
+            compact.add_node(node)
+        for origin in self.graph.nodes:
+            for destination, weight in self.graph.get_neighbors(origin):
+                if origin < destination:
+                    compact.add_edge(origin, destination, weight)
+        self.assertEqual(bfs(compact, "A"), bfs(self.graph, "A"))
+        self.assertEqual(dijkstra(compact, "A", "F"), dijkstra(self.graph, "A", "F"))
+        self.assertEqual(sum(edge.weight for edge in kruskal(compact)), 18)
+        self.assertIs(type(kruskal(compact)[0].weight), int)
+        self.assertEqual(hierholzer(compact, "A"), hierholzer(self.graph, "A"))
+
 if __name__ == "__main__":
     unittest.main()
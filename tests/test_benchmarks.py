@@ -0,0 +1,33 @@
+import unittest
+from graph import Graph
+from benchmarks import GENERATORS, barabasi_albert_graph, compare, grid_graph, layered_dag, run_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_generators(self):
+        for name, (generator, directed) in GENERATORS.items():
+            nodes, edges = generator(100, seed=1)
+            self.assertEqual(generator(100, seed=1), (nodes, edges))
+            self.assertNotEqual(generator(100, seed=2)[1], edges)
+            graph = Graph(directed=directed, weighted=True)
+            graph.add_nodes_from(nodes)
+            graph.add_edges_from(edges)
+            self.assertEqual(graph.freeze().num_edges, len(edges) * (1 if directed else 2))
+        grid = Graph(weighted=True)
+        grid.add_nodes_from(grid_graph(100)[0])
+        grid.add_edges_from(grid_graph(100)[1])
+        self.assertTrue(grid.has_eulerian_cycle())
+        nodes, edges = layered_dag(64, width=16)
+        self.assertEqual(len(edges), 3 * 16 * 16)
+        self.assertTrue(all(origin // 16 + 1 == destination // 16 for origin, destination, _ in edges))
+        self.assertEqual(len(barabasi_albert_graph(100, attachments=3)[1]), 97 * 3)
+
+    def test_run_and_compare(self):
+        results = run_benchmarks(["grid"], ["small"], repeat=1, benchmarks=["construction", "bfs"])
+        self.assertEqual(list(results["results"]), ["grid/small/construction", "grid/small/bfs"])
+        baseline = {"results": {key: dict(result) for key, result in results["results"].items()}}
+        self.assertTrue(all(row[-1] == "unchanged" for row in compare(results, baseline)))
+        baseline["results"]["grid/small/bfs"].update(best=1.0, peak_memory=2**30)
+        baseline["results"]["grid/small/construction"].update(best=1e-6)
+        rows = {row[0]: row[-1] for row in compare(results, baseline, threshold=0.25, min_time=0)}
+        self.assertEqual(rows, {"grid/small/construction": "regression", "grid/small/bfs": "faster"})
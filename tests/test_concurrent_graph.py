@@ -0,0 +1,82 @@
+import threading
+import unittest
+from algorithms import bfs, dijkstra
+from concurrent_graph import ConcurrentGraph
+from utils.errors import NodeNotFoundError
+
+class TestConcurrentGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = ConcurrentGraph(directed=True, weighted=True)
+        self.graph.add_nodes_from(["A", "B", "C"])
+
+    def test_snapshot_isolation(self):
+        self.graph.add_edge("A", "B", 2)
+        snapshot = self.graph.snapshot()
+        self.graph.add_edge("B", "C", 3)
+        self.graph.remove_node("A")
+        self.assertEqual(snapshot.get_neighbors("A"), [("B", 2)])
+        self.assertEqual(snapshot.get_neighbors("B"), [])
+        self.assertEqual(list(self.graph.snapshot().nodes), ["B", "C"])
+        self.assertEqual(self.graph.snapshot().get_predecessors("B"), [])
+        self.assertEqual(dijkstra(snapshot, "A", "B"), [2, [("A", "B")]])
+        self.assertEqual(bfs(self.graph.snapshot(), "B"), ["B", "C"])
+
+    def test_structural_sharing(self):
+        # Node order survives removals (and the rebuilds that drop their holes):
+        graph = ConcurrentGraph()
+        graph.add_nodes_from(range(1000))
+        first = graph.snapshot()
+        graph.remove_nodes_from(range(0, 1000, 2))
+        graph.add_nodes_from([0, 2000])
+        for i in range(1, 700, 2):
+            graph.remove_node(i)
+        self.assertEqual(list(graph.snapshot().nodes), list(range(701, 1000, 2)) + [0, 2000])
+        self.assertEqual(list(first.nodes), list(range(1000)))
+        # An update only copies the buckets it writes to:
+        before = graph.snapshot()
+        graph.add_edge(0, 2000)
+        after = graph.snapshot()
+        shared = sum(a is b for a, b in zip(before._successors._buckets, after._successors._buckets))
+        self.assertGreaterEqual(shared, len(after._successors._buckets) - 2)
+
+    def test_batch_is_atomic(self):
+        version = self.graph.version
+        with self.graph.batch():
+            self.graph.add_edge("A", "B", 1)
+            self.graph.add_edge("B", "C", 1)
+            self.assertEqual(self.graph.snapshot().out_degree("A"), 0)
+        self.assertEqual(self.graph.version, version + 1)
+        with self.assertRaises(NodeNotFoundError):
+            with self.graph.batch():
+                self.graph.remove_edge("A", "B")
+                self.graph.add_edge("A", "Z", 1)
+        self.assertEqual(self.graph.version, version + 1)
+        self.assertEqual(self.graph.snapshot().get_neighbors("A"), [("B", 1)])
+
+    def test_readers_never_see_partial_updates(self):
+        # Every batch adds a two-edge path, so a snapshot always has an even number of edges:
+        graph = ConcurrentGraph()
+        graph.add_nodes_from(range(100))
+        errors = []
+
+        def _read():
+            for _ in range(200):
+                snapshot = graph.snapshot()
+                if sum(snapshot.out_degree(node) for node in snapshot.nodes) % 4:
+                    errors.append(snapshot.version)
+
+        readers = [threading.Thread(target=_read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(98):
+            with graph.batch():
+                graph.add_edge(i, i + 1)
+                graph.add_edge(i + 1, i + 2)
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(graph.snapshot().degree(50), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
-from graph import Node, Edge, Graph
+import numpy as np
+from graph import Node, Edge, Graph, MutationLog, load
 from utils.errors import NodeNotFoundError, EdgeNotFoundError
 
 class TestGraph(unittest.TestCase):
@@ -46,5 +49,205 @@ class TestGraph(unittest.TestCase):
         self.graph.remove_node("C")  
         self.assertTrue(True)
 
+    def test_degree_counters(self):
+        for node in ["A", "B", "C"]:
+            self.graph.add_node(node)
+        self.graph.add_edge("A", "B", weight=1)
+        self.graph.add_edge("A", "C", weight=1)
+        self.graph.add_edge("C", "B", weight=1)
+        self.assertEqual(self.graph.out_degree("A"), 2)
+        self.assertEqual(self.graph.in_degree("B"), 2)
+        self.assertEqual(self.graph.degree("C"), 2)
+        self.assertEqual(self.graph.get_predecessors("B"), [("A", 1), ("C", 1)])
+        self.graph.remove_node("C")
+        self.assertEqual(self.graph.out_degree("A"), 1)
+        self.assertEqual(self.graph.in_degree("B"), 1)
+        self.assertEqual(self.graph.get_predecessors("B"), [("A", 1)])
+        self.graph.remove_edge("A", "B")
+        self.assertEqual(self.graph.in_degree("B"), 0)
+        self.assertEqual(self.graph.get_neighbors("A"), [])
+
+    def test_directed_eulerian_checks(self):
+        for node in ["A", "B", "C"]:
+            self.graph.add_node(node)
+        self.graph.add_edge("A", "B")
+        self.graph.add_edge("B", "C")
+        self.assertFalse(self.graph.has_eulerian_cycle())
+        self.assertTrue(self.graph.has_eulerian_path())
+        self.graph.add_edge("C", "A")
+        self.assertTrue(self.graph.has_eulerian_cycle())
+        self.assertTrue(self.graph.has_eulerian_path())
+
+    def test_undirected_eulerian_checks(self):
+        graph = Graph()
+        for node in ["A", "B", "C", "D"]:
+            graph.add_node(node)
+        graph.add_edge("B", "C")
+        graph.add_edge("C", "D")
+        self.assertFalse(graph.has_eulerian_cycle())
+        self.assertTrue(graph.has_eulerian_path())
+        graph.add_edge("D", "B")
+        self.assertTrue(graph.has_eulerian_cycle())
+
+    def test_slots(self):
+        self.assertFalse(hasattr(Node("A"), "__dict__"))
+        self.assertFalse(hasattr(Edge("A", "B"), "__dict__"))
+
+    def test_compact_graph(self):
+        graph = Graph(directed=True, weighted=True, compact=True)
+        for node in ["A", "B", "C"]:
+            graph.add_node(node)
+        graph.add_edge("A", "B", weight=2)
+        graph.add_edge("A", "C", weight=3)
+        graph.add_edge("C", "B", weight=1)
+        self.assertIn(Edge("A", "B", 2), graph.edges["A"])
+        self.assertEqual(graph.get_neighbors("A"), [("B", 2), ("C", 3)])
+        self.assertEqual(graph.get_predecessors("B"), [("A", 2), ("C", 1)])
+        self.assertEqual(list(graph.edges), ["A", "C"])
+        self.assertEqual(graph.reverse_edges["B"], [Edge("A", "B", 2), Edge("C", "B", 1)])
+        # Integer weights stay integers until a float weight is added:
+        self.assertIs(type(graph.get_neighbors("A")[0][1]), int)
+        # NumPy integers too, also once frozen:
+        graph.add_edge("B", "C", np.int64(4))
+        self.assertEqual(graph.get_neighbors("B"), [("C", 4)])
+        self.assertIs(type(graph.get_neighbors("B")[0][1]), int)
+        self.assertEqual(graph.freeze().weights.typecode, "q")
+        graph.remove_edge("B", "C")
+        standard = Graph(weighted=True)
+        standard.add_nodes_from([0, 1])
+        standard.add_edge(0, 1, np.int64(3))
+        frozen = standard.freeze()
+        self.assertEqual((frozen.weights.typecode, frozen.get_neighbors(0)), ("q", [(1, 3)]))
+        graph.set_weight("C", "B", 0.5)
+        self.assertEqual(graph.get_neighbors("C"), [("B", 0.5)])
+        self.assertEqual(graph.get_neighbors("A"), [("B", 2.0), ("C", 3.0)])
+        graph.remove_edge("A", "B")
+        self.assertNotIn(Edge("A", "B", 2), graph.edges["A"])
+        self.assertEqual(graph.in_degree("B"), 1)
+        graph.remove_node("C")
+        self.assertEqual(graph.out_degree("A"), 0)
+        self.assertEqual(graph.get_predecessors("B"), [])
+
+    def test_compact_undirected_graph(self):
+        graph = Graph(compact=True)
+        for node in ["A", "B", "C"]:
+            graph.add_node(node)
+        graph.add_edge("A", "B")
+        graph.add_edge("B", "C")
+        self.assertEqual(graph.get_neighbors("B"), [("A", 1), ("C", 1)])
+        self.assertTrue(graph.has_eulerian_path())
+        self.assertEqual(graph.freeze().get_neighbors("B"), [("A", 1), ("C", 1)])
+        graph.remove_node("B")
+        self.assertEqual(graph.degree("A"), 0)
+        self.assertEqual(dict(graph.edges), {})
+
+    def test_remove_parallel_edges(self):
+        self.graph.add_nodes_from(["A", "B", "C"])
+        self.graph.add_edges_from([("A", "B", 1), ("A", "C", 2), ("A", "B", 3)])
+        self.assertEqual(self.graph.get_neighbors("A"), [("B", 1), ("B", 3), ("C", 2)])
+        self.graph.remove_edge("A", "B")
+        self.assertEqual(self.graph.get_neighbors("A"), [("C", 2)])
+        self.assertEqual(self.graph.get_predecessors("B"), [])
+        self.assertEqual(self.graph.out_degree("A"), 1)
+
+    def test_remove_nodes_from(self):
+        for compact in (False, True):
+            graph = Graph(compact=compact)
+            graph.add_nodes_from(["A", "B", "C", "D"])
+            graph.add_edges_from([("A", "B"), ("B", "C"), ("C", "D"), ("D", "A")])
+            graph.remove_nodes_from(["B", "D", "Z"])
+            self.assertEqual(list(graph.nodes), ["A", "C"])
+            self.assertEqual(graph.get_neighbors("A"), [])
+            self.assertEqual(graph.degree("C"), 0)
+            self.assertEqual(dict(graph.edges), {})
+
+    def test_subscribe(self):
+        events = []
+        self.graph.subscribe(lambda *event: events.append(event))
+        self.graph.add_nodes_from(["A", "B"])
+        self.graph.add_edge("A", "B", 3)
+        self.graph.remove_node("B")
+        self.assertEqual(events, [("add_node", "A"), ("add_node", "B"), ("add_edge", "A", "B", 3), ("remove_node", "B")])
+        self.assertEqual(self.graph.version, 4)
+
+    def test_set_weight(self):
+        for directed, compact in [(True, False), (False, False), (True, True), (False, True)]:
+            graph = Graph(directed=directed, weighted=True, compact=compact)
+            graph.add_nodes_from(["A", "B", "C"])
+            graph.add_edges_from([("A", "B", 2), ("B", "C", 3)])
+            log = MutationLog(graph)
+            version = graph.version
+            graph.set_weight("A", "B", 5)
+            graph.update_weights([("B", "C", 1), ("A", "B", 4)])
+            self.assertEqual(graph.get_neighbors("A"), [("B", 4)])
+            self.assertEqual(graph.get_predecessors("C"), [("B", 1)])
+            if not directed:
+                self.assertEqual(graph.get_neighbors("B"), [("A", 4), ("C", 1)])
+            self.assertEqual(log.since(version), [(version + 1, "set_weight", "A", "B", 2, 5), (version + 2, "set_weight", "B", "C", 3, 1), (version + 3, "set_weight", "A", "B", 5, 4)])
+            log.truncate(version + 2)
+            self.assertEqual(len(log), 1)
+            with self.assertRaises(EdgeNotFoundError):
+                graph.update_weights([("B", "C", 7), ("C", "A", 1)])
+            self.assertEqual(graph.get_neighbors("B")[-1], ("C", 1))
+            self.assertEqual(graph.freeze().version, graph.version)
+
+    def test_add_edges_from(self):
+        self.graph.add_nodes_from(["A", "B", "C"], data={"A": "start"})
+        self.assertEqual(self.graph.nodes["A"].data, "start")
+        self.graph.add_edges_from([("A", "B"), ("B", "C")])
+        self.assertEqual(self.graph.get_neighbors("B"), [("C", 1)])
+        self.assertEqual(self.graph.get_predecessors("B"), [("A", 1)])
+        self.assertEqual(self.graph.degree("B"), 2)
+        with self.assertRaises(NodeNotFoundError):
+            self.graph.add_edges_from([("A", "C"), ("A", "Z")])
+        self.assertEqual(self.graph.get_neighbors("A"), [("B", 1)])
+
+    def test_from_edge_array(self):
+        for compact in (False, True):
+            graph = Graph.from_edge_array([2, 0, 0], [0, 1, 2], [5, 1, 3], directed=True, compact=compact)
+            self.assertEqual(list(graph.nodes), [0, 1, 2])
+            self.assertEqual(graph.get_neighbors(0), [(1, 1), (2, 3)])
+            self.assertEqual(graph.get_predecessors(0), [(2, 5)])
+            self.assertEqual(graph.in_degree(0), 1)
+            self.assertEqual(graph.out_degree(0), 2)
+        graph = Graph.from_edge_array([0, 1], [1, 2], compact=True)
+        self.assertFalse(graph.weighted)
+        self.assertEqual(graph.get_neighbors(1), [(0, 1), (2, 1)])
+        with self.assertRaises(ValueError):
+            Graph.from_edge_array([0, 1], [1])
+
+    def test_save_and_load(self):
+        self.graph.add_nodes_from(["A", "B", "C"], data={"B": "middle"})
+        self.graph.add_edges_from([("A", "B", 2), ("B", "C", 1.5), ("C", "A", 3)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.bin")
+            self.graph.save(path)
+            for mmap in (True, False):
+                graph = load(path, mmap=mmap)
+                self.assertTrue(graph.directed)
+                self.assertEqual(list(graph.nodes), ["A", "B", "C"])
+                self.assertEqual(graph.nodes["B"].data, "middle")
+                self.assertEqual(graph.get_neighbors("B"), [("C", 1.5)])
+                self.assertEqual(graph.get_predecessors("A"), [("C", 3)])
+                del graph
+            # Integer ids are stored as an array, node data as JSON:
+            numbered = Graph(weighted=True)
+            numbered.add_nodes_from([3, -1, 2**40], data={-1: {"label": [1, 2]}})
+            numbered.add_edges_from([(3, -1, 4), (-1, 2**40, 5)])
+            numbered.save(path)
+            graph = load(path)
+            self.assertEqual(graph.node_ids, [3, -1, 2**40])
+            self.assertEqual(graph.nodes[-1].data, {"label": [1, 2]})
+            self.assertEqual(graph.get_neighbors(-1), [(3, 4), (2**40, 5)])
+            del graph
+            with self.assertRaises(ValueError):
+                tuples = Graph()
+                tuples.add_node((1, 2))
+                tuples.save(path)
+            with open(path, "r+b") as file:
+                file.write(b"NOTGRAPH")
+            with self.assertRaises(ValueError):
+                load(path)
+
 if __name__ == "__main__":
     unittest.main()
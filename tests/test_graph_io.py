@@ -0,0 +1,79 @@
+import gzip
+import os
+import tempfile
+import unittest
+import networkx
+from graph import Graph
+from graph_io import iter_edges, read_csv, read_edgelist, read_graphml, read_jsonl, write_csv, write_edgelist, write_graphml, write_jsonl
+
+class TestGraphIO(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.graph = Graph(directed=False, weighted=True)
+        self.graph.add_nodes_from(["A", "B", "C", "D"], data={"A": {"label": "start"}})
+        self.graph.add_edges_from([("A", "B", 2), ("B", "C", 1.5), ("C", "A", 3), ("C", "C", 4)])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_iter_edges(self):
+        self.assertEqual(list(iter_edges(self.graph)), [("A", "B", 2), ("A", "C", 3), ("B", "C", 1.5), ("C", "C", 4)])
+
+    def test_read_edgelist(self):
+        with open(self.path("edges.txt"), "w") as file:
+            file.write("# origin destination weight\n1 2 5\n\n2 3 0.5 # comment\n")
+        graph = read_edgelist(self.path("edges.txt"), directed=True, weighted=True, nodetype=int, chunk_size=1)
+        self.assertEqual(list(graph.nodes), [1, 2, 3])
+        self.assertEqual(graph.get_neighbors(2), [(3, 0.5)])
+        self.assertEqual(graph.get_predecessors(2), [(1, 5)])
+
+    def test_read_gzip_csv(self):
+        with gzip.open(self.path("edges.csv.gz"), "wt") as file:
+            file.write("weight,target,source\n4,B,A\n7,C,B\n")
+        graph = read_csv(self.path("edges.csv.gz"), weighted=True)
+        self.assertEqual(graph.get_neighbors("B"), [("A", 4), ("C", 7)])
+
+    def test_round_trips(self):
+        formats = [
+            ("graph.txt", write_edgelist, read_edgelist),
+            ("graph.csv", write_csv, read_csv),
+            ("graph.jsonl.gz", write_jsonl, read_jsonl),
+            ("graph.graphml", write_graphml, read_graphml)
+        ]
+        for name, write, read in formats:
+            write(self.graph, self.path(name), chunk_size=2)
+            graph = read(self.path(name), weighted=True, chunk_size=2)
+            self.assertFalse(graph.directed)
+            for node_id in ["A", "B", "C"]:
+                self.assertEqual(sorted(graph.get_neighbors(node_id)), sorted(self.graph.get_neighbors(node_id)))
+        # GraphML and JSON Lines keep isolated nodes, only JSON Lines keeps node data:
+        self.assertIn("D", graph.nodes)
+        graph = read_jsonl(self.path("graph.jsonl.gz"))
+        self.assertEqual(list(graph.nodes), ["A", "B", "C", "D"])
+        self.assertEqual(graph.nodes["A"].data, {"label": "start"})
+
+    def test_read_jsonl_late_node_records(self):
+        with open(self.path("late.jsonl"), "w") as file:
+            file.write('{"source": "A", "target": "B"}\n{"source": "B", "target": "C"}\n{"node": "A", "data": {"label": "start"}}\n')
+        graph = read_jsonl(self.path("late.jsonl"), chunk_size=1)
+        self.assertEqual(list(graph.nodes), ["A", "B", "C"])
+        self.assertEqual(graph.nodes["A"].data, {"label": "start"})
+
+    def test_read_networkx_graphml(self):
+        # networkx names the keys d0, d1... and declares which one holds the weight:
+        other = networkx.DiGraph()
+        other.add_node("a", label="first")
+        other.add_edge("a", "b", weight=5.0, color="red")
+        other.add_edge("b", "c")
+        networkx.write_graphml(other, self.path("networkx.graphml"))
+        graph = read_graphml(self.path("networkx.graphml"), weighted=True)
+        self.assertTrue(graph.directed)
+        self.assertEqual(graph.get_neighbors("a"), [("b", 5)])
+        self.assertEqual(graph.get_neighbors("b"), [("c", 1)])
+
+if __name__ == "__main__":
+    unittest.main()
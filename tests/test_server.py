@@ -0,0 +1,74 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+from algorithms import dijkstra, dijkstra_many
+from graph import Graph
+from server import GraphServer
+
+class TestGraphServer(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph(directed=False, weighted=True)
+        self.graph.add_nodes_from(["A", "B", "C", "D"])
+        self.graph.add_edges_from([("A", "B", 1), ("B", "C", 2), ("C", "D", 1), ("A", "D", 5)])
+        self.server = GraphServer(self.graph)
+
+    def test_batched_shortest_paths(self):
+        requests = [{"id": i, "op": "dijkstra", "source": "A", "target": target} for i, target in enumerate("BCD")]
+
+        async def _queries():
+            return await asyncio.gather(*(self.server.query(request) for request in requests))
+
+        with mock.patch("server.dijkstra_many", wraps=dijkstra_many) as batch:
+            responses = asyncio.run(_queries())
+        batch.assert_called_once()
+        self.assertEqual(self.server._batch_tasks, set()) # Kept until the batch is answered
+        self.assertEqual([response["result"] for response in responses], [dijkstra(self.graph, "A", target) for target in "BCD"])
+
+    def test_queries(self):
+        async def _query(**request):
+            return await self.server.query(request)
+
+        self.assertEqual(asyncio.run(_query(op="bfs", source="A"))["result"], ["A", "B", "D", "C"])
+        self.assertEqual(len(asyncio.run(_query(op="mst"))["result"]), 3)
+        self.assertEqual(asyncio.run(_query(op="mst", algorithm="boruvka"))["result"], asyncio.run(_query(op="mst"))["result"])
+        self.assertEqual(asyncio.run(_query(op="eulerian"))["result"][0], asyncio.run(_query(op="eulerian"))["result"][-1])
+        self.assertIn("NodeNotFoundError", asyncio.run(_query(id=7, op="dijkstra", source="A", target="Z"))["error"])
+        self.assertIn("error", asyncio.run(_query(op="unknown")))
+
+    def test_unexpected_errors(self):
+        async def _query(server, **request):
+            return await server.query(request)
+
+        empty = GraphServer(Graph())
+        self.assertIn("empty", asyncio.run(_query(empty, id=1, op="mst", algorithm="prim"))["error"])
+        with mock.patch("server.dijkstra_many", side_effect=RuntimeError("boom")):
+            response = asyncio.run(_query(self.server, id=2, op="dijkstra", source="A", target="B"))
+        self.assertEqual(response, {"id": 2, "error": "RuntimeError: boom"})
+
+    def test_json_lines_protocol(self):
+        async def _session():
+            server = await self.server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"id": 1, "op": "dijkstra", "source": "A", "target": "C"}\nnot json\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            # Results that can't be serialized still get a response:
+            with mock.patch.object(self.server, "query", return_value={"id": 3, "result": object()}):
+                writer.write(b'{"id": 3, "op": "bfs", "source": "A"}\n')
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            await self.server.close()
+            return responses
+
+        responses = sorted(asyncio.run(_session()), key=lambda response: response["id"] or 0)
+        self.assertIn("error", responses[0])
+        self.assertEqual(responses[1], {"id": 1, "result": [3, [["A", "B"], ["B", "C"]]]})
+        self.assertEqual(responses[2]["id"], 3)
+        self.assertIn("TypeError", responses[2]["error"])
+
+if __name__ == "__main__":
+    unittest.main()